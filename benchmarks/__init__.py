@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Benchmarks.
+
+Run from the project root, e.g.::
+
+    python -m benchmarks.decoder
+
+The real KTUG table is not distributed with this package; benchmarks run
+against a synthetic table of similar shape unless a table file is given
+with ``--table``.
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from argparse import ArgumentParser
+import io
+import random
+import sys
+import timeit
+
+from ktug_hanyang_pua.fileformats.table_text import load_mappings_as_text_table
+from ktug_hanyang_pua.models import Mapping
+
+
+PY3 = sys.version_info.major == 3
+
+if PY3:
+    unichr = chr
+
+# 첫가끝 자모 범위
+CHOSEONG = tuple(range(0x1100, 0x1160)) + tuple(range(0xA960, 0xA97D))
+JUNGSEONG = tuple(range(0x1160, 0x11A8)) + tuple(range(0xD7B0, 0xD7C7))
+JONGSEONG = tuple(range(0x11A8, 0x1200)) + tuple(range(0xD7CB, 0xD7FC))
+
+PUA_START = 0xE0BC
+
+
+def make_mappings(n_mappings=5000, seed=0):
+    ''' Generate a synthetic PUA-to-Jamo table of KTUG-like shape.
+    '''
+    rng = random.Random(seed)
+    seen = set()
+    mappings = []
+    source = PUA_START
+    while len(mappings) < n_mappings:
+        target = (rng.choice(CHOSEONG), rng.choice(JUNGSEONG))
+        if rng.random() < 0.6:
+            target += (rng.choice(JONGSEONG),)
+        if target in seen:
+            continue
+        seen.add(target)
+        # 가끔 빈 자리를 두어 그룹이 여러 개가 되도록
+        if rng.random() < 0.01:
+            source += rng.randint(2, 16)
+        mappings.append(Mapping(
+            source=(source,),
+            target=target,
+            comment=None,
+        ))
+        source += 1
+    return mappings
+
+
+def load_mappings(filename):
+    with io.open(filename, 'r', encoding='utf-8') as fp:
+        return [
+            line for line in load_mappings_as_text_table(fp)
+            if isinstance(line, Mapping)
+        ]
+
+
+def make_pua_text(mappings, length=100000, seed=0):
+    ''' Generate PUA text with some ASCII noise.
+    '''
+    rng = random.Random(seed)
+    sources = [m.source[0] for m in mappings]
+    chars = []
+    for i in range(length):
+        if rng.random() < 0.1:
+            chars.append(u' ')
+        else:
+            chars.append(unichr(rng.choice(sources)))
+    return u''.join(chars)
+
+
+def make_jamo_text(mappings, length=100000, seed=0):
+    ''' Generate Jamo text with some ASCII noise.
+    '''
+    rng = random.Random(seed)
+    targets = [m.target for m in mappings]
+    chars = []
+    while len(chars) < length:
+        if rng.random() < 0.1:
+            chars.append(u' ')
+        else:
+            chars.extend(unichr(code) for code in rng.choice(targets))
+    return u''.join(chars)
+
+
+def bench_argparse(description):
+    parser = ArgumentParser(description=description)
+    parser.add_argument(
+        '--table',
+        action='store',
+        help='KTUG text table. A synthetic table is used if omitted.',
+    )
+    parser.add_argument(
+        '--length',
+        type=int,
+        default=100000,
+        help='Length of the sample text in characters.',
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=5,
+        help='Number of timing repetitions; the best one is reported.',
+    )
+    return parser
+
+
+def get_mappings(args):
+    if args.table:
+        return load_mappings(args.table)
+    return make_mappings()
+
+
+def measure(func, repeat):
+    ''' Best wall-clock time of `func()` in seconds.
+    '''
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def report(label, seconds, n_items, unit='chars', baseline=None):
+    line = '{:<32} {:10.3f} ms {:14,.0f} {}/s'.format(
+        label, seconds * 1000, n_items / seconds, unit,
+    )
+    if baseline is not None:
+        line += '  x{:.1f}'.format(baseline / seconds)
+    print(line)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Table loading: parsing the text table against the on-disk cache. '''
+from __future__ import absolute_import
+from __future__ import print_function
+import io
+import os.path
+import shutil
+import tempfile
+
+from ktug_hanyang_pua.codec import Tables
+from ktug_hanyang_pua.fileformats.table_text import dump_mappings_as_text_table  # noqa
+
+from . import bench_argparse
+from . import get_mappings
+from . import measure
+from . import report
+
+
+def compile_tables(filename, cache_dir=None):
+    tables = Tables(filename, cache_dir=cache_dir)
+    tables.compile()
+    return tables
+
+
+def main():
+    parser = bench_argparse(__doc__)
+    args = parser.parse_args()
+    mappings = get_mappings(args)
+
+    tempdir = tempfile.mkdtemp()
+    try:
+        filename = args.table
+        if filename is None:
+            filename = os.path.join(tempdir, 'table.txt')
+            with io.open(filename, 'w', encoding='utf-8') as fp:
+                dump_mappings_as_text_table(mappings, fp)
+        cache_dir = os.path.join(tempdir, 'cache')
+
+        print('{} mappings'.format(len(mappings)))
+        baseline = measure(lambda: compile_tables(filename), args.repeat)
+        report('parse and compile', baseline, len(mappings),
+               unit='mappings')
+
+        expected = compile_tables(filename, cache_dir)
+        tables = compile_tables(filename, cache_dir)
+        assert tables.decoder.table == expected.decoder.table
+        assert tables.encoder.transitions == expected.encoder.transitions
+        elapsed = measure(
+            lambda: compile_tables(filename, cache_dir), args.repeat,
+        )
+        report('cached', elapsed, len(mappings), unit='mappings',
+               baseline=baseline)
+    finally:
+        shutil.rmtree(tempdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Decoder throughput against a naive per-character loop, and the cost
+of a single lookup in a dict against the flat offsets of BulkDecoder.
+'''
+from __future__ import absolute_import
+from __future__ import print_function
+
+from ktug_hanyang_pua.bulk import BulkDecoder
+from ktug_hanyang_pua.bulk import numpy
+from ktug_hanyang_pua.decoder import Decoder
+from ktug_hanyang_pua.decoder import iter_decoding_items
+
+from . import bench_argparse
+from . import get_mappings
+from . import make_pua_text
+from . import measure
+from . import report
+from . import unichr
+
+
+def naive_decode(mappings, text):
+    table = {}
+    for mapping in mappings:
+        table[mapping.source[0]] = u''.join(
+            unichr(code) for code in mapping.target
+        )
+    chars = []
+    for char in text:
+        chars.append(table.get(ord(char), char))
+    return u''.join(chars)
+
+
+def make_offsets_lookup(bulk):
+    ''' Lookup through the offsets, lengths and pool of a BulkDecoder. '''
+    start = bulk.start
+    offsets = bulk.offsets
+    lengths = bulk.lengths
+    pool = bulk.pool
+    size = len(lengths)
+
+    def lookup(codepoint):
+        i = codepoint - start
+        if 0 <= i < size:
+            length = lengths[i]
+            if length >= 0:
+                offset = offsets[i]
+                return pool[offset:offset + length]
+        return None
+    return lookup
+
+
+def lookup_all(lookup, codepoints):
+    for codepoint in codepoints:
+        lookup(codepoint)
+
+
+def main():
+    parser = bench_argparse(__doc__)
+    args = parser.parse_args()
+    mappings = get_mappings(args)
+    text = make_pua_text(mappings, args.length)
+    texts = text.split(u' ')
+
+    decoder = Decoder(mappings)
+    assert decoder.decode(text) == naive_decode(mappings, text)
+
+    print('{} mappings, {} chars'.format(len(mappings), len(text)))
+    baseline = measure(lambda: naive_decode(mappings, text), args.repeat)
+    report('naive per-character', baseline, len(text))
+    elapsed = measure(lambda: decoder.decode(text), args.repeat)
+    report('Decoder.decode', elapsed, len(text), baseline=baseline)
+    elapsed = measure(lambda: list(decoder.decode_many(texts)), args.repeat)
+    report('Decoder.decode_many', elapsed, len(text), baseline=baseline)
+    elapsed = measure(lambda: Decoder(mappings), args.repeat)
+    report('Decoder() compile', elapsed, len(mappings), unit='mappings')
+
+    # 한 글자씩 찾는 비용: 사전, BulkDecoder 의 배열, 그리고 str.translate()
+    codepoints = [ord(char) for char in text]
+    chars = list(text)
+    table = dict(iter_decoding_items(mappings))
+    translation = decoder.table
+    offsets_lookup = make_offsets_lookup(
+        BulkDecoder(mappings, use_numpy=False)
+    )
+    lookups = [
+        ('dict.get', lambda: lookup_all(table.get, codepoints)),
+        ('BulkDecoder offsets/lengths/pool',
+         lambda: lookup_all(offsets_lookup, codepoints)),
+        ('str.translate per char',
+         lambda: lookup_all(lambda char: char.translate(translation), chars)),
+    ]
+    lookup_baseline = None
+    for label, func in lookups:
+        elapsed = measure(func, args.repeat)
+        report(label, elapsed, len(text), unit='lookups',
+               baseline=lookup_baseline)
+        if lookup_baseline is None:
+            lookup_baseline = elapsed
+
+    if numpy is None:
+        print('numpy is not available: skipping BulkDecoder')
+        return
+    bulk = BulkDecoder(mappings)
+    assert bulk.decode(text) == decoder.decode(text)
+    codepoints = numpy.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+    elapsed = measure(lambda: bulk.decode(text), args.repeat)
+    report('BulkDecoder.decode', elapsed, len(text), baseline=baseline)
+    elapsed = measure(
+        lambda: bulk.decode_codepoints(codepoints), args.repeat,
+    )
+    report('BulkDecoder.decode_codepoints', elapsed, len(text),
+           baseline=baseline)
+    elapsed = measure(lambda: BulkDecoder(mappings), args.repeat)
+    report('BulkDecoder() compile', elapsed, len(mappings), unit='mappings')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Encoder throughput for each representation of the tree. '''
+from __future__ import absolute_import
+from __future__ import print_function
+from bisect import bisect_left
+import sys
+
+from ktug_hanyang_pua.dfa import DFAEncoder
+from ktug_hanyang_pua.doublearray import DoubleArrayEncoder
+from ktug_hanyang_pua.encoder import Encoder
+from ktug_hanyang_pua.models import Mapping
+from ktug_hanyang_pua.tree import build_tree
+
+from . import bench_argparse
+from . import get_mappings
+from . import make_jamo_text
+from . import measure
+from . import report
+
+
+class SortedChildren(tuple):
+    ''' `node_childrens` item, searched as it is. '''
+
+    def get(self, codepoint):
+        i = bisect_left(self, (codepoint,))
+        if i < len(self) and self[i][0] == codepoint:
+            return self[i][1]
+
+
+class TupleEncoder(Encoder):
+    ''' Baseline: walks the `node_childrens` tuples from `build_tree()`. '''
+
+    def __init__(self, nodelist, node_childrens):
+        targets = [
+            -1 if node.target is None else node.target for node in nodelist
+        ]
+        targets[0] = -1
+        self.targets = tuple(targets)
+        self.transitions = tuple(
+            SortedChildren(children) for children in node_childrens
+        )
+
+
+def deep_sizeof(obj, seen=None):
+    ''' Approximate memory used by `obj` and everything it refers to. '''
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (tuple, list, set)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(obj, name):
+                size += deep_sizeof(getattr(obj, name), seen)
+    return size
+
+
+def build(mappings):
+    mappings = (
+        Mapping(source=m.target, target=m.source[0], comment=None)
+        for m in mappings
+    )
+    return build_tree(mappings)
+
+
+def main():
+    parser = bench_argparse(__doc__)
+    args = parser.parse_args()
+    mappings = get_mappings(args)
+    text = make_jamo_text(mappings, args.length)
+    nodelist, node_childrens = build(mappings)
+
+    encoders = [
+        ('node_childrens tuples', TupleEncoder),
+        ('per-node dicts (Encoder)', Encoder),
+        ('DFA (DFAEncoder)', DFAEncoder),
+        ('double-array', DoubleArrayEncoder),
+    ]
+    expected = Encoder(nodelist, node_childrens).encode(text)
+
+    print('{} mappings, {} nodes, {} chars'.format(
+        len(mappings), len(nodelist), len(text),
+    ))
+    baseline = None
+    for label, encoder_class in encoders:
+        encoder = encoder_class.from_tree(nodelist, node_childrens)
+        assert encoder.encode(text) == expected
+        elapsed = measure(lambda: encoder.encode(text), args.repeat)
+        report(label, elapsed, len(text), baseline=baseline)
+        if baseline is None:
+            baseline = elapsed
+
+    for label, encoder_class in encoders:
+        elapsed = measure(
+            lambda: encoder_class.from_tree(nodelist, node_childrens),
+            args.repeat,
+        )
+        report(label + ' build', elapsed, len(nodelist), unit='nodes')
+
+    for label, encoder_class in encoders:
+        encoder = encoder_class.from_tree(nodelist, node_childrens)
+        print('{:<32} {:10,} bytes'.format(
+            label + ' size', deep_sizeof(encoder),
+        ))
+
+
+if __name__ == '__main__':
+    main()
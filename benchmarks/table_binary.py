@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Binary table loading: per-record reads against bulk arrays, and the
+trade-off of merging groups over holes with ``max_gap``.
+'''
+from __future__ import absolute_import
+from __future__ import print_function
+from io import BytesIO
+import random
+import struct
+
+from ktug_hanyang_pua.fileformats.table_binary import BinaryTable
+from ktug_hanyang_pua.fileformats.table_binary import dump_mappings_as_binary_table  # noqa
+from ktug_hanyang_pua.fileformats.table_binary import load_mappings_as_binary_table  # noqa
+from ktug_hanyang_pua.fileformats.table_binary import read_struct
+from ktug_hanyang_pua.fileformats.table_binary import ushort
+from ktug_hanyang_pua.fileformats.table_binary import ushort_pair
+from ktug_hanyang_pua.models import Mapping
+
+from . import bench_argparse
+from . import get_mappings
+from . import measure
+from . import report
+
+
+def sequential_load(input_fp):
+    ''' Baseline: one read and unpack per group, mapping and target. '''
+    n_groups = read_struct(input_fp, ushort)[0]
+    groupheaders = [
+        read_struct(input_fp, ushort_pair)
+        for i in range(n_groups)
+    ]
+    mappings = []
+    for groupstart, grouplength in groupheaders:
+        for i in range(grouplength):
+            targetlen = read_struct(input_fp, ushort)[0]
+            mappings.append((groupstart + i, targetlen))
+    for source, targetlen in mappings:
+        target_struct = struct.Struct('<{}H'.format(targetlen))
+        target = read_struct(input_fp, target_struct)
+        yield Mapping(source=(source,), target=target, comment=None)
+
+
+def bench_max_gap(mappings, repeat):
+    ''' Groups, file size and lookup speed by ``max_gap``. '''
+    sources = [m.source[0] for m in mappings]
+    lookup_sources = list(range(min(sources), max(sources) + 1))
+    baseline = None
+    for max_gap in (0, 1, 4, 16, 64):
+        output_fp = BytesIO()
+        n_groups, n_mappings = dump_mappings_as_binary_table(
+            mappings, output_fp, version=2, max_gap=max_gap,
+        )
+        table = BinaryTable(output_fp.getvalue())
+        index = table.index
+        elapsed = measure(
+            lambda: [index(source) for source in lookup_sources], repeat,
+        )
+        report('max_gap={}'.format(max_gap), elapsed, len(lookup_sources),
+               unit='lookups', baseline=baseline)
+        print('{:<32} {:10,} groups, {:,} bytes'.format(
+            '', n_groups, len(output_fp.getvalue()),
+        ))
+        if baseline is None:
+            baseline = elapsed
+
+
+def main():
+    parser = bench_argparse(__doc__)
+    args = parser.parse_args()
+    mappings = get_mappings(args)
+
+    print('{} mappings'.format(len(mappings)))
+    output_fp = BytesIO()
+    dump_mappings_as_binary_table(mappings, output_fp)
+    data = output_fp.getvalue()
+    expected = list(sequential_load(BytesIO(data)))
+    baseline = measure(
+        lambda: list(sequential_load(BytesIO(data))), args.repeat,
+    )
+    report('v1 per-record reads', baseline, len(mappings), unit='mappings')
+
+    for version in (1, 2):
+        output_fp = BytesIO()
+        dump_mappings_as_binary_table(mappings, output_fp, version=version)
+        data = output_fp.getvalue()
+        assert list(load_mappings_as_binary_table(BytesIO(data))) == expected
+        elapsed = measure(
+            lambda: list(load_mappings_as_binary_table(BytesIO(data))),
+            args.repeat,
+        )
+        report('v{} bulk arrays'.format(version), elapsed, len(mappings),
+               unit='mappings', baseline=baseline)
+
+        sources = [m.source[0] for m in mappings[::len(mappings) // 10]]
+        elapsed = measure(
+            lambda: [BinaryTable(data)[source] for source in sources],
+            args.repeat,
+        )
+        report('v{} BinaryTable 10 lookups'.format(version), elapsed,
+               len(sources), unit='lookups')
+
+    # 드문드문한 표: 매핑의 10% 를 뺀다.
+    rng = random.Random(0)
+    sparse = [m for m in mappings if rng.random() >= 0.1]
+    for label, table_mappings in (('dense', mappings), ('sparse', sparse)):
+        print('{} table, {} mappings'.format(label, len(table_mappings)))
+        bench_max_gap(table_mappings, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
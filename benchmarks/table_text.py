@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Text table parsing: the regex fast path against the parsec grammar. '''
+from __future__ import absolute_import
+from __future__ import print_function
+from io import StringIO
+from multiprocessing import cpu_count
+
+from ktug_hanyang_pua.fileformats.table_text import dump_mappings_as_text_table  # noqa
+from ktug_hanyang_pua.fileformats.table_text import load_mappings_as_text_table  # noqa
+from ktug_hanyang_pua.formats import LineFormat
+from ktug_hanyang_pua.models import Comment
+
+from . import bench_argparse
+from . import get_mappings
+from . import measure
+from . import report
+
+
+def make_text_table(mappings):
+    lines = []
+    for i, mapping in enumerate(mappings):
+        if i % 100 == 0:
+            lines.append(Comment(u' group {}'.format(i // 100)))
+        if i % 10 == 0:
+            mapping = mapping._replace(comment=Comment(u' note'))
+        lines.append(mapping)
+    output_fp = StringIO()
+    dump_mappings_as_text_table(lines, output_fp)
+    return output_fp.getvalue()
+
+
+def main():
+    parser = bench_argparse(__doc__)
+    args = parser.parse_args()
+    mappings = get_mappings(args)
+    text = make_text_table(mappings)
+    lines = text.splitlines(True)
+
+    lineFormat = LineFormat()
+    expected = [lineFormat.parse_fallback(line) for line in lines]
+    assert [lineFormat.parse(line) for line in lines] == expected
+    assert list(load_mappings_as_text_table(StringIO(text))) == expected
+
+    print('{} lines'.format(len(lines)))
+    baseline = measure(
+        lambda: [lineFormat.parse_fallback(line) for line in lines],
+        args.repeat,
+    )
+    report('parsec grammar', baseline, len(lines), unit='lines')
+    elapsed = measure(
+        lambda: [lineFormat.parse(line) for line in lines],
+        args.repeat,
+    )
+    report('LineFormat.parse', elapsed, len(lines), unit='lines',
+           baseline=baseline)
+    elapsed = measure(
+        lambda: list(load_mappings_as_text_table(StringIO(text))),
+        args.repeat,
+    )
+    report('load_mappings_as_text_table', elapsed, len(lines), unit='lines',
+           baseline=baseline)
+
+    jobs = max(2, cpu_count())
+    assert list(
+        load_mappings_as_text_table(StringIO(text), jobs=jobs)
+    ) == expected
+    elapsed = measure(
+        lambda: list(load_mappings_as_text_table(StringIO(text), jobs=jobs)),
+        args.repeat,
+    )
+    report('... jobs={}'.format(jobs), elapsed, len(lines), unit='lines',
+           baseline=baseline)
+
+
+if __name__ == '__main__':
+    main()
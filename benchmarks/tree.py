@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Tree building: build_tree() against build_compact_tree(), and child
+lookups in a ChildrenIndex with and without the root table.
+'''
+from __future__ import absolute_import
+from __future__ import print_function
+import tracemalloc
+
+from ktug_hanyang_pua.models import Mapping
+from ktug_hanyang_pua.tree import ChildrenIndex
+from ktug_hanyang_pua.tree import build_compact_tree
+from ktug_hanyang_pua.tree import build_tree
+
+from . import bench_argparse
+from . import make_mappings
+from . import measure
+from . import report
+
+
+def peak_memory(func):
+    ''' Peak memory allocated while `func()` runs and holds its result. '''
+    tracemalloc.start()
+    try:
+        result = func()  # noqa
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def walk(index, sources):
+    ''' Look up every source sequence from the root. '''
+    child = index.child
+    for source in sources:
+        node_index = 0
+        for codepoint in source:
+            node_index = child(node_index, codepoint)
+
+
+def main():
+    parser = bench_argparse(__doc__)
+    parser.add_argument(
+        '--mappings',
+        type=int,
+        default=50000,
+        help='Number of synthetic mappings.',
+    )
+    args = parser.parse_args()
+    mappings = make_mappings(args.mappings)
+    mappings = [
+        Mapping(source=m.target, target=m.source[0], comment=None)
+        for m in mappings
+    ]
+
+    print('{} mappings'.format(len(mappings)))
+    builders = [
+        ('build_tree', lambda: build_tree(mappings)),
+        ('build_compact_tree', lambda: build_compact_tree(mappings)),
+    ]
+    baseline = None
+    for label, build in builders:
+        elapsed = measure(build, args.repeat)
+        report(label, elapsed, len(mappings), unit='mappings',
+               baseline=baseline)
+        if baseline is None:
+            baseline = elapsed
+    for label, build in builders:
+        print('{:<32} {:10,} bytes peak'.format(label, peak_memory(build)))
+
+    index = build_compact_tree(mappings).children_index
+    indexes = [
+        ('bisect', ChildrenIndex(
+            index.offsets, index.codepoints, index.nodes, root_ranges=(),
+        )),
+        ('bisect + root tables', index),
+    ]
+    sources = [m.source for m in mappings]
+    n_lookups = sum(len(source) for source in sources)
+    baseline = None
+    for label, index in indexes:
+        elapsed = measure(lambda: walk(index, sources), args.repeat)
+        report(label, elapsed, n_lookups, unit='lookups', baseline=baseline)
+        if baseline is None:
+            baseline = elapsed
+
+
+if __name__ == '__main__':
+    main()
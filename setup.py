@@ -130,6 +130,7 @@ setup_info = {
     'tests_require': tests_require,
     'extras_require': {
         'test': tests_require,
+        'numpy': ['numpy'],
     },
     'setup_requires': setup_requires,
     'message_extractors': {
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Bulk PUA-to-Jamo decoding of UTF-32 codepoint arrays.
+
+Uses NumPy if it is installed, otherwise falls back to pure Python.
+'''
+from __future__ import absolute_import
+from __future__ import print_function
+from array import array
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .models import Mapping
+from .table import make_groups
+
+
+PY3 = sys.version_info.major == 3
+
+if PY3:
+    unichr = chr
+
+
+class BulkDecoder(object):
+    ''' Hanyang PUA to Unicode Jamo decoder for codepoint arrays.
+
+    The targets are laid out densely over the groups of the sources, as in
+    the binary table format: the target of ``codepoint`` is
+    ``pool[offsets[i]:offsets[i] + lengths[i]]`` where
+    ``i = codepoint - start``, and ``lengths[i]`` is -1 for the codepoints
+    between the groups.
+
+    :param mappings: an iterable of `Mapping` with PUA ``source`` and
+        Jamo ``target``, e.g. what `load_mappings_as_binary_table()` yields.
+        Lines other than mappings are ignored.
+    :param use_numpy: use NumPy; by default, if it is installed.
+    '''
+
+    __slots__ = (
+        'use_numpy',
+        'table',
+        'start',
+        'offsets',
+        'lengths',
+        'pool',
+    )
+
+    def __init__(self, mappings, use_numpy=None):
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ImportError('numpy is not available')
+        self.use_numpy = use_numpy
+
+        table = {}
+        for mapping in mappings:
+            if not isinstance(mapping, Mapping):
+                continue
+            if len(mapping.source) != 1:
+                raise ValueError(
+                    'source should be a single codepoint: {!r}'.format(mapping)
+                )
+            table[mapping.source[0]] = tuple(mapping.target)
+        self.table = table
+
+        groups = make_groups(sorted(table))
+        start = groups[0][0] if groups else 0
+        size = groups[-1][1] - start + 1 if groups else 0
+        offsets = array('l', [0]) * size
+        lengths = array('l', [-1]) * size
+        pool = array('l')
+        for groupstart, groupend in groups:
+            for source in range(groupstart, groupend + 1):
+                target = table[source]
+                offsets[source - start] = len(pool)
+                lengths[source - start] = len(target)
+                pool.extend(target)
+
+        if use_numpy:
+            offsets = numpy.array(offsets, dtype=numpy.int32)
+            lengths = numpy.array(lengths, dtype=numpy.int32)
+            pool = numpy.array(pool, dtype=numpy.uint32)
+        self.start = start
+        self.offsets = offsets
+        self.lengths = lengths
+        self.pool = pool
+
+    def __repr__(self):
+        return '{}(<{} mappings>, use_numpy={})'.format(
+            type(self).__name__,
+            len(self.table),
+            self.use_numpy,
+        )
+
+    def decode_codepoints(self, codepoints):
+        ''' Decode a sequence of codepoints.
+
+        :returns: a `numpy.ndarray` of `numpy.uint32` with NumPy, otherwise
+            an `array.array` of ``'I'``.
+        '''
+        if self.use_numpy:
+            return self._decode_numpy(codepoints)
+        return self._decode_python(codepoints)
+
+    def decode(self, text):
+        if self.use_numpy:
+            codepoints = numpy.frombuffer(
+                text.encode('utf-32-le'), dtype='<u4'
+            )
+            decoded = self._decode_numpy(codepoints)
+            return decoded.astype('<u4').tobytes().decode('utf-32-le')
+        decoded = self._decode_python(ord(char) for char in text)
+        return u''.join(unichr(code) for code in decoded)
+
+    def _decode_python(self, codepoints):
+        table = self.table
+        decoded = array('I')
+        for codepoint in codepoints:
+            target = table.get(codepoint)
+            if target is None:
+                decoded.append(codepoint)
+            else:
+                decoded.extend(target)
+        return decoded
+
+    def _decode_numpy(self, codepoints):
+        # 코드포인트는 0x10FFFF 이하이므로 int32 로 충분하다.
+        int32 = numpy.int32
+        codepoints = numpy.asarray(codepoints, dtype=numpy.uint32)
+        if not len(codepoints):
+            return codepoints.copy()
+        offsets = self.offsets
+        lengths = self.lengths
+        if not len(lengths):
+            return codepoints.copy()
+
+        index = codepoints.astype(int32) - int32(self.start)
+        hit = (index >= 0) & (index < len(lengths))
+        index[~hit] = 0
+        counts = lengths[index]
+        hit &= counts >= 0
+
+        # 사상되지 않은 코드포인트는 pool 뒤에 붙여서 길이 1 짜리 target 인
+        # 것처럼 다룬다.
+        pool = numpy.concatenate([self.pool, codepoints])
+        sources = numpy.where(
+            hit,
+            offsets[index],
+            numpy.arange(len(self.pool), len(pool), dtype=int32),
+        )
+        counts = numpy.where(hit, counts, int32(1))
+
+        # 출력 위치 j 는 입력 i 의 target 중 j - (ends[i] - counts[i]) 번째
+        ends = numpy.cumsum(counts, dtype=int32)
+        shifts = numpy.repeat(sources - (ends - counts), counts)
+        shifts += numpy.arange(int(ends[-1]), dtype=int32)
+        return pool[shifts]
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' On-disk cache of compiled decoders and encoders.
+
+An entry holds the `Decoder` and the `Encoder` of a table file, written
+with `marshal`. It is named after the SHA-256 of the contents of the table
+file, its format and the Python version, so that a changed table misses
+the cache by itself, and the entry is loaded in one read.
+'''
+from __future__ import absolute_import
+from __future__ import print_function
+from hashlib import sha256
+import io
+import marshal
+import os
+import os.path
+import sys
+import tempfile
+
+from .decoder import Decoder
+from .encoder import Encoder
+
+
+# 항목의 내용이 바뀌면 올린다.
+CACHE_VERSION = 2
+
+replace = getattr(os, 'replace', os.rename)
+
+
+def default_cache_dir():
+    ''' ``$XDG_CACHE_HOME/ktug-hanyang-pua``, by default under ``~/.cache``.
+    '''
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache',
+    )
+    return os.path.join(cache_home, 'ktug-hanyang-pua')
+
+
+def cache_filename(cache_dir, data, format):
+    ''' Path of the cache entry of a table file.
+
+    :param data: contents of the table file, as bytes.
+    :param format: format of the table file.
+    '''
+    digest = sha256()
+    digest.update(data)
+    digest.update('\0{}\0{}\0{}.{}'.format(
+        format, CACHE_VERSION, *sys.version_info[:2]
+    ).encode('ascii'))
+    return os.path.join(cache_dir, digest.hexdigest() + '.marshal')
+
+
+def dump_tables(decoder, encoder, fp):
+    fp.write(marshal.dumps((
+        CACHE_VERSION,
+        decoder.table,
+        encoder.targets,
+        encoder.transitions,
+    )))
+
+
+def load_tables(fp):
+    ''' Load ``(decoder, encoder)`` written by `dump_tables()`.
+
+    :raises ValueError: if the entry is corrupted or of another version.
+    '''
+    try:
+        entry = marshal.loads(fp.read())
+    except (EOFError, TypeError, ValueError) as e:
+        raise ValueError('corrupted cache entry: {}'.format(e))
+    if not isinstance(entry, tuple) or len(entry) != 4:
+        raise ValueError('corrupted cache entry')
+    version, table, targets, transitions = entry
+    if version != CACHE_VERSION:
+        raise ValueError('unsupported cache version: {}'.format(version))
+    return (
+        Decoder.from_table(table),
+        Encoder.from_transitions(targets, transitions),
+    )
+
+
+def read_cache(filename):
+    ''' ``(decoder, encoder)`` of a cache entry, or None if missing. '''
+    try:
+        fp = io.open(filename, 'rb')
+    except (IOError, OSError):
+        return None
+    with fp:
+        return load_tables(fp)
+
+
+def write_cache(filename, decoder, encoder):
+    ''' Write a cache entry atomically, through a temporary file. '''
+    cache_dir = os.path.dirname(filename)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    fd, tempname = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with io.open(fd, 'wb') as fp:
+            dump_tables(decoder, encoder, fp)
+        replace(tempname, filename)
+    except Exception:
+        os.unlink(tempname)
+        raise
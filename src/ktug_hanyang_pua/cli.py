@@ -24,6 +24,7 @@ import gettext
 import io
 import logging
 import os.path
+import re
 import sys
 
 # PYTHON_ARGCOMPLETE_OK
@@ -33,6 +34,11 @@ except ImportError:
     argcomplete = None
 
 from . import __version__
+from .codec import Tables
+from .decoder import Decoder
+from .doublearray import build_double_array
+from .encoder import Encoder
+from .encoder import IncrementalEncoder
 from .fileformats.table_binary import load_mappings_as_binary_table
 from .fileformats.table_binary import dump_mappings_as_binary_table
 from .fileformats.table_json import dump_mappings_as_json_table
@@ -40,6 +46,7 @@ from .fileformats.table_json import load_mappings_as_json_table
 from .fileformats.table_text import load_mappings_as_text_table
 from .fileformats.table_text import dump_mappings_as_text_table
 from .fileformats.tree_binary import dump_tree_as_binary
+from .fileformats.tree_doublearray import dump_tree_as_double_array
 from .fileformats.tree_json import dump_tree_as_json
 from .models import Mapping
 from .table import switch_source_and_targets
@@ -48,6 +55,9 @@ from .tree import build_tree
 PY3 = sys.version_info.major == 3
 logger = logging.getLogger(__name__)
 
+if PY3:
+    unichr = chr
+
 locale_dir = os.path.join(os.path.dirname(__file__), 'locale')
 t = gettext.translation('ktug-hanyang-pua', locale_dir, fallback=True)
 if PY3:
@@ -56,6 +66,13 @@ else:
     _ = t.ugettext
 
 
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+COMMANDS = ('convert', )
+
+VERBOSE_OPTION = re.compile('^(-v+|--verbose)$')
+
+
 def open_input(filename, format):
     if format == 'text':
         if filename is not None:
@@ -94,7 +111,7 @@ def open_output(filename, output_format):
                 return io.open(filename, 'wb')
         else:
             return sys.stdout
-    if output_format == 'binary':
+    if output_format in ('binary', 'double-array'):
         if filename is not None:
             return io.open(filename, 'wb')
         else:
@@ -116,27 +133,89 @@ def open_output(filename, output_format):
     raise SystemExit(1)
 
 
+def load_table(input_fp, input_format, jobs=None):
+    if input_format == 'text':
+        return load_mappings_as_text_table(input_fp, jobs=jobs)
+    if input_format == 'binary':
+        return load_mappings_as_binary_table(input_fp)
+    if input_format == 'json':
+        return load_mappings_as_json_table(input_fp)
+    logger.error(
+        _('Unsupported input format: %s', input_format)
+    )
+    raise SystemExit(1)
+
+
+def open_text_input(filename, encoding):
+    if filename is not None:
+        return io.open(filename, 'r', encoding=encoding, newline='')
+    return io.open(
+        sys.stdin.fileno(), 'r', encoding=encoding, newline='', closefd=False
+    )
+
+
+def open_text_output(filename, encoding):
+    if filename is not None:
+        return io.open(filename, 'w', encoding=encoding, newline='')
+    return io.open(
+        sys.stdout.fileno(), 'w', encoding=encoding, newline='', closefd=False
+    )
+
+
+def decode_stream(decoder, input_fp, output_fp, buffer_size):
+    n = 0
+    for chunk in iter(lambda: input_fp.read(buffer_size), ''):
+        chunk = decoder.decode(chunk)
+        output_fp.write(chunk)
+        n += len(chunk)
+    return n
+
+
+def encode_stream(encoder, input_fp, output_fp, buffer_size):
+    incrementalEncoder = IncrementalEncoder(encoder)
+    n = 0
+    for chunk in iter(lambda: input_fp.read(buffer_size), ''):
+        codepoints = incrementalEncoder.feed(ord(char) for char in chunk)
+        chunk = ''.join(unichr(code) for code in codepoints)
+        output_fp.write(chunk)
+        n += len(chunk)
+    codepoints = incrementalEncoder.flush()
+    chunk = ''.join(unichr(code) for code in codepoints)
+    output_fp.write(chunk)
+    n += len(chunk)
+    return n
+
+
+def split_command(argv):
+    ''' Find a command in the arguments, after verbosity options only.
+
+    :returns: the command, or None, and the arguments without it.
+    '''
+    for i, arg in enumerate(argv):
+        if arg in COMMANDS:
+            return arg, argv[:i] + argv[i + 1:]
+        if not VERBOSE_OPTION.match(arg):
+            break
+    return None, argv
+
+
 def main():
     gettext.gettext = t.gettext
+    command, argv = split_command(sys.argv[1:])
+    if command == 'convert':
+        return convert_main(argv)
+
     parser = main_argparse()
     if argcomplete:
         argcomplete.autocomplete(parser)
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.max_gap and args.table_binary_version == 1:
+        parser.error(_('--max-gap needs --table-binary-version 2'))
     configureLogging(args.verbose)
     logger.info('args: %s', args)
 
     with open_input(args.INPUT_FILE, args.input_format) as input_fp:
-        if args.input_format == 'text':
-            parsed = load_mappings_as_text_table(input_fp)
-        elif args.input_format == 'binary':
-            parsed = load_mappings_as_binary_table(input_fp)
-        elif args.input_format == 'json':
-            parsed = load_mappings_as_json_table(input_fp)
-        else:
-            logger.error(
-                _('Unsupported input format: %s', args.input_format)
-            )
-            raise SystemExit(1)
+        parsed = load_table(input_fp, args.input_format, args.jobs)
 
         with open_output(args.output_file, args.output_format) as output_fp:
             if args.data_model == 'table':
@@ -155,7 +234,10 @@ def main():
                     )
                     n_groups, n_mappings = dump_mappings_as_binary_table(
                         mappings,
-                        output_fp
+                        output_fp,
+                        version=args.table_binary_version,
+                        memory_budget=args.memory_budget,
+                        max_gap=args.max_gap,
                     )
                     logger.info(
                         _('%s groups of %s mappings have been written.'),
@@ -168,7 +250,8 @@ def main():
                         if isinstance(line, Mapping)
                     )
                     n_mappings = dump_mappings_as_json_table(
-                        mappings, output_fp
+                        mappings, output_fp, compact=args.compact,
+                        columnar=args.json_layout == 'columns',
                     )
                     logger.info(
                         _('%s mappings have been written.'), n_mappings,
@@ -208,7 +291,7 @@ def main():
                     )
                     for m in mappings
                 )
-                tree, __ = build_tree(mappings)
+                tree, node_childrens = build_tree(mappings)
 
                 if args.output_format == 'binary':
                     if output_fp.isatty():
@@ -216,15 +299,33 @@ def main():
                             _('Rejecting to output binary to a terminal.')
                         )
                         raise SystemExit(1)
-                    n = dump_tree_as_binary(tree, output_fp)
+                    n = dump_tree_as_binary(
+                        tree, output_fp,
+                        version=args.tree_binary_version,
+                        node_childrens=node_childrens,
+                    )
                     logger.info(
                         _('%s nodes have been written.'), n
                     )
                 elif args.output_format == 'json':
-                    n_nodes = dump_tree_as_json(tree, output_fp)
+                    n_nodes = dump_tree_as_json(
+                        tree, output_fp, compact=args.compact,
+                        columnar=args.json_layout == 'columns',
+                    )
                     logger.info(
                         _('%s nodes have been written.'), n_nodes,
                     )
+                elif args.output_format == 'double-array':
+                    if output_fp.isatty():
+                        logger.error(
+                            _('Rejecting to output binary to a terminal.')
+                        )
+                        raise SystemExit(1)
+                    trie = build_double_array(tree, node_childrens)
+                    n = dump_tree_as_double_array(trie, output_fp)
+                    logger.info(
+                        _('%s slots have been written.'), n
+                    )
                 else:
                     logger.error(
                         _('Not supported format for data model %s: %s'),
@@ -234,8 +335,64 @@ def main():
                     raise SystemExit(1)
 
 
+def convert_main(argv=None):
+    parser = convert_argparse()
+    if argcomplete:
+        argcomplete.autocomplete(parser)
+    args = parser.parse_args(argv)
+    configureLogging(args.verbose)
+    logger.info('args: %s', args)
+
+    if args.cache_dir is not None:
+        tables = Tables(args.table, args.table_format, args.cache_dir)
+        if args.direction == 'encode':
+            converter = tables.encoder
+        else:
+            converter = tables.decoder
+    else:
+        with open_input(args.table, args.table_format) as table_fp:
+            mappings = load_table(table_fp, args.table_format, args.jobs)
+            if args.direction == 'encode':
+                converter = Encoder.from_mappings(mappings)
+            else:
+                converter = Decoder(mappings)
+    logger.info('%r', converter)
+
+    with open_text_input(args.INPUT_FILE, args.encoding) as input_fp:
+        with open_text_output(args.output_file, args.encoding) as output_fp:
+            if args.direction == 'encode':
+                n = encode_stream(
+                    converter, input_fp, output_fp, args.buffer_size
+                )
+            else:
+                n = decode_stream(
+                    converter, input_fp, output_fp, args.buffer_size
+                )
+    logger.info(
+        _('%s characters have been written.'), n
+    )
+
+
+def megabytes(value):
+    return int(value) * 1024 * 1024
+
+
 def main_argparse():
-    parser = ArgumentParser()
+    parser = ArgumentParser(
+        usage=_(
+            '%(prog)s [options] [INPUT_FILE]\n'
+            '       %(prog)s [-v] convert [options] [INPUT_FILE]'
+        ),
+        description=_(
+            'Convert a KTUG Hanyang PUA table between formats and models.'
+        ),
+        epilog=_(
+            'To convert text between Hanyang PUA and Unicode Jamo with a '
+            'table, use the `convert\' command: see `%(prog)s convert '
+            '--help\'. To read a table file named `convert\', give it as '
+            '`./convert\'.'
+        ),
+    )
     parser.add_argument(
         '--version',
         action='version',
@@ -268,13 +425,73 @@ def main_argparse():
         default='text',
         help=_('Input format'),
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help=_('Number of processes to parse a text table with'),
+    )
     parser.add_argument(
         '-F', '--output-format',
         action='store',
-        choices=('text', 'binary', 'json'),
+        choices=('text', 'binary', 'json', 'double-array'),
         default='text',
         help=_('Output format'),
     )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help=_('Write JSON without indentation'),
+    )
+    parser.add_argument(
+        '--json-layout',
+        choices=('records', 'columns'),
+        default='records',
+        help=_(
+            'Layout of JSON output: an array of objects, or an object of '
+            'parallel arrays, which is smaller and faster to parse.'
+        ),
+    )
+    parser.add_argument(
+        '--table-binary-version',
+        type=int,
+        choices=(1, 2),
+        default=1,
+        help=_(
+            'Version of the binary format of `table\' model. Version 2 has '
+            'the offsets of the targets for random access.'
+        ),
+    )
+    parser.add_argument(
+        '--memory-budget',
+        type=megabytes,
+        metavar='MB',
+        help=_(
+            'Write the binary table within about this many megabytes, '
+            'sorting through temporary files if needed.'
+        ),
+    )
+    parser.add_argument(
+        '--max-gap',
+        type=int,
+        default=0,
+        metavar='N',
+        help=_(
+            'Merge the groups of the binary table which are at most this '
+            'many codepoints apart, marking the codepoints between them as '
+            'holes. Needs version 2 of the binary table.'
+        ),
+    )
+    parser.add_argument(
+        '--tree-binary-version',
+        type=int,
+        choices=(1, 2),
+        default=1,
+        help=_(
+            'Version of the binary format of `tree\' model. Version 2 has '
+            'no limits on the number of nodes and the codepoints.'
+        ),
+    )
     parser.add_argument(
         '-S', '--switch',
         action='store_true',
@@ -290,6 +507,96 @@ def main_argparse():
     return parser
 
 
+def convert_argparse():
+    parser = ArgumentParser(
+        prog='{} convert'.format(os.path.basename(sys.argv[0])),
+        description=_(
+            'Convert text between Hanyang PUA and Unicode Jamo.'
+        ),
+    )
+    parser.add_argument(
+        '--version',
+        action='version',
+        version='%(prog)s {}'.format(__version__),
+        help=_('output version information and exit')
+    )
+    parser.add_argument(
+        '-v', '--verbose',
+        action='count',
+        help=_('increase verbosity')
+    )
+    parser.add_argument(
+        '-t', '--table',
+        action='store',
+        required=True,
+        help=_('PUA-to-Jamo table file.'),
+    )
+    parser.add_argument(
+        '--table-format',
+        action='store',
+        choices=('text', 'binary', 'json'),
+        default='text',
+        help=_('Table format'),
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help=_('Number of processes to parse a text table with'),
+    )
+    parser.add_argument(
+        '--cache-dir',
+        action='store',
+        metavar='DIR',
+        help=_(
+            'Cache the compiled table in this directory, by the contents '
+            'of the table file, and load it from there on later runs.'
+        ),
+    )
+    direction = parser.add_mutually_exclusive_group()
+    direction.add_argument(
+        '-d', '--decode',
+        action='store_const',
+        dest='direction',
+        const='decode',
+        default='decode',
+        help=_('Convert Hanyang PUA to Unicode Jamo (default).'),
+    )
+    direction.add_argument(
+        '-e', '--encode',
+        action='store_const',
+        dest='direction',
+        const='encode',
+        help=_('Convert Unicode Jamo to Hanyang PUA.'),
+    )
+    parser.add_argument(
+        '--encoding',
+        action='store',
+        default='utf-8',
+        help=_('Character encoding of the input and output.'),
+    )
+    parser.add_argument(
+        '--buffer-size',
+        action='store',
+        type=int,
+        default=DEFAULT_BUFFER_SIZE,
+        help=_('Number of characters to read and write at once.'),
+    )
+    parser.add_argument(
+        '-o', '--output-file',
+        action='store',
+        help=_('Output file. The standard output will be used if ommitted.')
+    )
+    parser.add_argument(
+        'INPUT_FILE',
+        action='store',
+        nargs='?',
+        default=None,
+        help=_('Input file. The standard input will be used if ommitted.'),
+    )
+    return parser
+
+
 def configureLogging(verbosity):
     verbosity = verbosity or 0
     if verbosity == 1:
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Python codec for UTF-8 text in Hanyang PUA.
+
+Decoding reads UTF-8 bytes and converts Hanyang PUA to Unicode Jamo;
+encoding converts Unicode Jamo to Hanyang PUA and writes UTF-8 bytes::
+
+    register('hanyang-pua-table.txt')
+    with io.open('pua.txt', encoding='hanyang-pua') as fp:
+        jamo = fp.read()
+
+The table is loaded and compiled when the codec is first looked up, and
+is shared by every lookup of the same table file. With a ``cache_dir``,
+the compiled table is also kept on disk, so that other processes load it
+in one read instead of parsing the table file again::
+
+    register('hanyang-pua-table.txt', cache_dir=default_cache_dir())
+
+Note that neither `io.TextIOWrapper` nor `codecs.open()` finalizes its
+encoder: a Jamo sequence at the very end of the text, which might still be
+continued, is not written. Use `open()` of this module, which writes it on
+`close()`::
+
+    with open('pua.txt', 'w') as fp:
+        fp.write(jamo)
+'''
+from __future__ import absolute_import
+from __future__ import print_function
+import codecs
+import io
+import logging
+import os.path
+import sys
+
+from .cache import cache_filename
+from .cache import default_cache_dir  # noqa: F401
+from .cache import read_cache
+from .cache import write_cache
+from .decoder import Decoder
+from .encoder import Encoder
+from .encoder import IncrementalEncoder as JamoIncrementalEncoder
+from .fileformats.table_binary import load_mappings_as_binary_table
+from .fileformats.table_json import load_mappings_as_json_table
+from .fileformats.table_text import load_mappings_as_text_table
+from .models import Mapping
+
+
+PY3 = sys.version_info.major == 3
+
+if PY3:
+    unichr = chr
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_NAME = 'hanyang-pua'
+
+_tables = {}
+
+
+def load_mappings(filename, format='text'):
+    with io.open(filename, 'rb') as fp:
+        return read_mappings(fp, format)
+
+
+def read_mappings(fp, format='text'):
+    ''' Read the mappings of a table from a binary file. '''
+    if format == 'text':
+        if PY3:
+            fp = io.TextIOWrapper(fp, encoding='utf-8')
+        # Note: parsec in Python 2 requires str
+        load = load_mappings_as_text_table
+    elif format == 'binary':
+        load = load_mappings_as_binary_table
+    elif format == 'json':
+        fp = io.TextIOWrapper(fp, encoding='utf-8')
+        load = load_mappings_as_json_table
+    else:
+        raise ValueError('Unsupported table format: {}'.format(format))
+    return [
+        mapping for mapping in load(fp)
+        if isinstance(mapping, Mapping)
+    ]
+
+
+class Tables(object):
+    ''' Decoder and encoder of a table file, compiled on first use.
+
+    :param cache_dir: if given, the compiled decoder and encoder are cached
+        in this directory by the contents of the table file.
+    '''
+
+    __slots__ = (
+        'filename',
+        'format',
+        'cache_dir',
+        '_decoder',
+        '_encoder',
+    )
+
+    def __init__(self, filename, format='text', cache_dir=None):
+        self.filename = filename
+        self.format = format
+        self.cache_dir = cache_dir
+        self._decoder = None
+        self._encoder = None
+
+    def __repr__(self):
+        return '{}({!r}, {!r})'.format(
+            type(self).__name__,
+            self.filename,
+            self.format,
+        )
+
+    def compile(self):
+        if self.cache_dir is None:
+            mappings = load_mappings(self.filename, self.format)
+            self._decoder = Decoder(mappings)
+            self._encoder = Encoder.from_mappings(mappings)
+            return
+
+        with io.open(self.filename, 'rb') as fp:
+            data = fp.read()
+        filename = cache_filename(self.cache_dir, data, self.format)
+        try:
+            tables = read_cache(filename)
+        except ValueError as e:
+            logger.warning('ignoring cache %s: %s', filename, e)
+            tables = None
+        if tables is not None:
+            self._decoder, self._encoder = tables
+            return
+
+        mappings = read_mappings(io.BytesIO(data), self.format)
+        self._decoder = Decoder(mappings)
+        self._encoder = Encoder.from_mappings(mappings)
+        try:
+            write_cache(filename, self._decoder, self._encoder)
+        except (IOError, OSError) as e:
+            logger.warning('cannot write cache %s: %s', filename, e)
+
+    @property
+    def decoder(self):
+        if self._decoder is None:
+            self.compile()
+        return self._decoder
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self.compile()
+        return self._encoder
+
+
+def get_tables(filename, format='text', cache_dir=None):
+    key = (os.path.abspath(filename), format, cache_dir)
+    try:
+        return _tables[key]
+    except KeyError:
+        tables = _tables[key] = Tables(filename, format, cache_dir)
+        return tables
+
+
+def encode_jamo(encoder, input, final):
+    codepoints = encoder.feed(ord(char) for char in input)
+    if final:
+        codepoints += encoder.flush()
+    return u''.join(unichr(code) for code in codepoints)
+
+
+class Codec(codecs.Codec):
+
+    tables = None
+
+    def encode(self, input, errors='strict'):
+        text = self.tables.encoder.encode(input)
+        return codecs.utf_8_encode(text, errors)[0], len(input)
+
+    def decode(self, input, errors='strict'):
+        text, consumed = codecs.utf_8_decode(input, errors, True)
+        return self.tables.decoder.decode(text), consumed
+
+
+class IncrementalEncoder(codecs.IncrementalEncoder):
+
+    tables = None
+
+    def __init__(self, errors='strict'):
+        codecs.IncrementalEncoder.__init__(self, errors)
+        self.encoder = JamoIncrementalEncoder(self.tables.encoder)
+
+    def encode(self, input, final=False):
+        text = encode_jamo(self.encoder, input, final)
+        return codecs.utf_8_encode(text, self.errors)[0]
+
+    def reset(self):
+        self.encoder.reset()
+
+
+class IncrementalDecoder(codecs.IncrementalDecoder):
+
+    tables = None
+
+    def __init__(self, errors='strict'):
+        codecs.IncrementalDecoder.__init__(self, errors)
+        self.utf8decoder = codecs.getincrementaldecoder('utf-8')(errors)
+
+    def decode(self, input, final=False):
+        text = self.utf8decoder.decode(input, final)
+        return self.tables.decoder.decode(text)
+
+    def reset(self):
+        self.utf8decoder.reset()
+
+    def getstate(self):
+        return self.utf8decoder.getstate()
+
+    def setstate(self, state):
+        self.utf8decoder.setstate(state)
+
+
+class StreamWriter(Codec, codecs.StreamWriter):
+
+    def __init__(self, stream, errors='strict'):
+        codecs.StreamWriter.__init__(self, stream, errors)
+        self.encoder = JamoIncrementalEncoder(self.tables.encoder)
+
+    def encode(self, input, errors='strict'):
+        text = encode_jamo(self.encoder, input, False)
+        return codecs.utf_8_encode(text, errors)[0], len(input)
+
+    def reset(self):
+        text = encode_jamo(self.encoder, u'', True)
+        if text:
+            self.stream.write(codecs.utf_8_encode(text, self.errors)[0])
+        codecs.StreamWriter.reset(self)
+
+    def close(self):
+        self.reset()
+        self.stream.close()
+
+    def __exit__(self, type, value, tb):
+        self.close()
+
+
+class StreamReaderWriter(codecs.StreamReaderWriter):
+    ''' `codecs.StreamReaderWriter` which finalizes the encoder on close.
+    '''
+
+    def close(self):
+        if not self.stream.closed:
+            self.writer.reset()
+        self.stream.close()
+
+    def __exit__(self, type, value, tb):
+        self.close()
+
+
+def open(filename, mode='r', encoding=DEFAULT_NAME, errors='strict',
+         buffering=-1):
+    ''' Open a file in a codec, as `codecs.open()` does.
+
+    Unlike `codecs.open()`, the Jamo sequence pending at the end of the
+    text is written on `close()`.
+    '''
+    if 'b' not in mode:
+        mode = mode + 'b'
+    fp = io.open(filename, mode, buffering)
+    try:
+        codecInfo = codecs.lookup(encoding)
+        streamReaderWriter = StreamReaderWriter(
+            fp, codecInfo.streamreader, codecInfo.streamwriter, errors,
+        )
+    except Exception:
+        fp.close()
+        raise
+    streamReaderWriter.encoding = encoding
+    return streamReaderWriter
+
+
+class StreamReader(Codec, codecs.StreamReader):
+
+    def decode(self, input, errors='strict'):
+        text, consumed = codecs.utf_8_decode(input, errors, False)
+        return self.tables.decoder.decode(text), consumed
+
+
+def make_codec_info(name, tables):
+    attrs = {
+        'tables': tables,
+    }
+    codec = type(str('Codec'), (Codec,), attrs)()
+    return codecs.CodecInfo(
+        name=name,
+        encode=codec.encode,
+        decode=codec.decode,
+        incrementalencoder=type(
+            str('IncrementalEncoder'), (IncrementalEncoder,), attrs,
+        ),
+        incrementaldecoder=type(
+            str('IncrementalDecoder'), (IncrementalDecoder,), attrs,
+        ),
+        streamwriter=type(str('StreamWriter'), (StreamWriter,), attrs),
+        streamreader=type(str('StreamReader'), (StreamReader,), attrs),
+    )
+
+
+def normalize_name(name):
+    return name.lower().replace('-', '_').replace(' ', '_')
+
+
+def register(filename, format='text', name=DEFAULT_NAME, cache_dir=None):
+    ''' Register a codec named `name` for the table file.
+
+    Nothing is loaded until the codec is looked up.
+
+    :param filename: PUA-to-Jamo table file.
+    :param format: ``'text'``, ``'binary'`` or ``'json'``.
+    :param name: codec name.
+    :param cache_dir: directory to cache the compiled table in, e.g.
+        `default_cache_dir()`; no caching by default.
+    '''
+    normalized = normalize_name(name)
+
+    def search(encoding):
+        if normalize_name(encoding) != normalized:
+            return None
+        return make_codec_info(
+            name, get_tables(filename, format, cache_dir),
+        )
+
+    codecs.register(search)
+    return search
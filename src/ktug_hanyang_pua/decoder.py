@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+
+from .models import Mapping
+
+
+PY3 = sys.version_info.major == 3
+
+if PY3:
+    unichr = chr
+
+
+def iter_decoding_items(mappings):
+    ''' ``(source, target)`` of PUA-to-Jamo mappings, with the source as a
+    codepoint and the target as a string.
+    '''
+    for mapping in mappings:
+        if not isinstance(mapping, Mapping):
+            continue
+        if len(mapping.source) != 1:
+            raise ValueError(
+                'source should be a single codepoint: {!r}'.format(mapping)
+            )
+        source = mapping.source[0]
+        target = u''.join(unichr(code) for code in mapping.target)
+        yield source, target
+
+
+def make_translation_table(mappings):
+    ''' Compile PUA-to-Jamo mappings into a table for `str.translate()`.
+    '''
+    table = dict(iter_decoding_items(mappings))
+    if PY3:
+        table = str.maketrans(table)
+    return table
+
+
+class Decoder(object):
+    ''' Hanyang PUA to Unicode Jamo decoder.
+
+    :param mappings: an iterable of `Mapping` with PUA ``source`` and
+        Jamo ``target``, e.g. what `load_mappings_as_text_table()` yields.
+        Lines other than mappings are ignored.
+    '''
+
+    __slots__ = (
+        'table',
+    )
+
+    def __init__(self, mappings):
+        self.table = make_translation_table(mappings)
+
+    @classmethod
+    def from_table(cls, table):
+        ''' Make a decoder of a table of `make_translation_table()`. '''
+        decoder = cls.__new__(cls)
+        decoder.table = table
+        return decoder
+
+    def __repr__(self):
+        return '{}(<{} mappings>)'.format(
+            type(self).__name__,
+            len(self.table),
+        )
+
+    def decode(self, text):
+        return text.translate(self.table)
+
+    def decode_many(self, texts):
+        table = self.table
+        for text in texts:
+            yield text.translate(table)
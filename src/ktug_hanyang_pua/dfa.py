@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+from array import array
+
+from .encoder import Encoder
+from .encoder import scan_longest_match
+
+
+# 입력 부류는 코드포인트 256 개씩의 쪽마다 평평한 배열에 둔다.
+PAGE_BITS = 8
+PAGE_MASK = (1 << PAGE_BITS) - 1
+
+
+class DFA(object):
+    ''' Tree compiled into flat transition tables.
+
+    States are the node indexes of the tree. Every codepoint which appears
+    in the tree has an input class from 1; class 0 is for all the others.
+    The class of ``codepoint`` is ``pages[codepoint >> 8][codepoint & 0xFF]``,
+    or 0 past the last page. The pages without any of the codepoints, i.e.
+    all but a few blocks of the Jamo ranges, are one array of zeros.
+
+    A state has a row only for its classes from ``lows[state]`` up to
+    ``highs[state]``, excluding it:
+
+    - ``transitions[bases[state] + class]``: the next state, or 0.
+    - ``highs[state]``: 0 if the state has no transitions.
+    - ``accepts[state]``: the target of the state, or -1.
+    '''
+
+    __slots__ = (
+        'pages',
+        'n_classes',
+        'lows',
+        'highs',
+        'bases',
+        'transitions',
+        'accepts',
+    )
+
+    def __init__(self, pages, n_classes, lows, highs, bases, transitions,
+                 accepts):
+        self.pages = pages
+        self.n_classes = n_classes
+        self.lows = lows
+        self.highs = highs
+        self.bases = bases
+        self.transitions = transitions
+        self.accepts = accepts
+
+    def __repr__(self):
+        return '{}(<{} states>, <{} classes>)'.format(
+            type(self).__name__,
+            len(self.accepts),
+            self.n_classes,
+        )
+
+    def input_class(self, codepoint):
+        page = codepoint >> PAGE_BITS
+        if page < len(self.pages):
+            return self.pages[page][codepoint & PAGE_MASK]
+        return 0
+
+    def transition(self, state, codepoint):
+        ''' The next state, or -1. '''
+        input_class = self.input_class(codepoint)
+        if self.lows[state] <= input_class < self.highs[state]:
+            return self.transitions[self.bases[state] + input_class] or -1
+        return -1
+
+
+def compile_dfa(nodelist, node_childrens):
+    codepoints = sorted(set(
+        codepoint
+        for children in node_childrens
+        for codepoint, child in children
+    ))
+    classes = dict(
+        (codepoint, input_class)
+        for input_class, codepoint in enumerate(codepoints, 1)
+    )
+    n_classes = len(codepoints) + 1
+
+    class_typecode = typecode_for(n_classes)
+    empty_page = array(class_typecode, [0]) * (PAGE_MASK + 1)
+    n_pages = (codepoints[-1] >> PAGE_BITS) + 1 if codepoints else 0
+    pages = [empty_page] * n_pages
+    for codepoint, input_class in classes.items():
+        page = codepoint >> PAGE_BITS
+        if pages[page] is empty_page:
+            pages[page] = array(class_typecode, empty_page)
+        pages[page][codepoint & PAGE_MASK] = input_class
+
+    # 상태마다 자식의 부류가 있는 범위만 줄로 이어 붙인다.
+    lows = array('i', [0]) * len(nodelist)
+    highs = array('i', [0]) * len(nodelist)
+    bases = array('i', [0]) * len(nodelist)
+    transitions = array(typecode_for(len(nodelist)))
+    for state, children in enumerate(node_childrens):
+        if not children:
+            continue
+        row = [(classes[codepoint], child) for codepoint, child in children]
+        low = min(row)[0]
+        high = max(row)[0] + 1
+        lows[state] = low
+        highs[state] = high
+        bases[state] = len(transitions) - low
+        transitions.extend([0] * (high - low))
+        for input_class, child in row:
+            transitions[bases[state] + input_class] = child
+
+    accepts = array('i', (
+        -1 if node.target is None else node.target
+        for node in nodelist
+    ))
+    return DFA(pages, n_classes, lows, highs, bases, transitions, accepts)
+
+
+def typecode_for(n):
+    ''' Smallest unsigned array typecode for the values below ``n``. '''
+    if n <= 0x100:
+        return 'B'
+    if n <= 0x10000:
+        return 'H'
+    return 'I'
+
+
+class DFAEncoder(Encoder):
+    ''' `Encoder` running on the `DFA` compiled from the tree.
+    '''
+
+    __slots__ = (
+        'dfa',
+    )
+
+    def __init__(self, nodelist, node_childrens):
+        self.dfa = compile_dfa(nodelist, node_childrens)
+        # 루트의 target 은 빈 자모열에 대응하므로 쓰지 않는다.
+        self.dfa.accepts[0] = -1
+
+    def __repr__(self):
+        return '{}({!r})'.format(
+            type(self).__name__,
+            self.dfa,
+        )
+
+    def scan(self, state, codepoints, final):
+        dfa = self.dfa
+        pages = dfa.pages
+        n_pages = len(pages)
+        lows = dfa.lows
+        highs = dfa.highs
+        bases = dfa.bases
+        transitions = dfa.transitions
+
+        def step(node, codepoint):
+            page = codepoint >> PAGE_BITS
+            if page < n_pages:
+                input_class = pages[page][codepoint & PAGE_MASK]
+                if lows[node] <= input_class < highs[node]:
+                    return transitions[bases[node] + input_class]
+            return 0
+        return scan_longest_match(
+            state, codepoints, final, step, dfa.accepts, highs,
+        )
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+from array import array
+
+from .encoder import Encoder
+from .encoder import scan_longest_match
+
+
+MAX_FAILURES = 16
+
+
+class DoubleArrayTrie(object):
+    ''' Tree in the double-array (BASE/CHECK) layout.
+
+    Every codepoint in the tree has a code from 1, in the order of
+    ``alphabet``. A transition from slot ``s`` by code ``c`` goes to slot
+    ``t = base[s] + c`` if ``check[t] == s``. Slot 0 is the root.
+
+    - ``base[s]``: 0 if ``s`` has no children.
+    - ``check[s]``: the parent slot, or -1 for the root and unused slots.
+    - ``targets[s]``: the target of ``s``, or -1.
+
+    The arrays are padded so that ``base[s] + c`` is always in range.
+    '''
+
+    __slots__ = (
+        'alphabet',
+        'codes',
+        'base',
+        'check',
+        'targets',
+    )
+
+    def __init__(self, alphabet, base, check, targets):
+        self.alphabet = alphabet
+        self.codes = dict(
+            (codepoint, code)
+            for code, codepoint in enumerate(alphabet, 1)
+        )
+        self.base = base
+        self.check = check
+        self.targets = targets
+
+    def __repr__(self):
+        return '{}(<{} slots>, <{} codes>)'.format(
+            type(self).__name__,
+            len(self.base),
+            len(self.alphabet),
+        )
+
+    def __len__(self):
+        return len(self.base)
+
+    def transition(self, slot, codepoint):
+        code = self.codes.get(codepoint)
+        if code is None:
+            return -1
+        next_slot = self.base[slot] + code
+        if self.check[next_slot] == slot:
+            return next_slot
+        return -1
+
+    def lookup(self, codepoints):
+        ''' Target of the codepoint sequence, or None.
+        '''
+        slot = 0
+        for codepoint in codepoints:
+            slot = self.transition(slot, codepoint)
+            if slot < 0:
+                return None
+        target = self.targets[slot]
+        if target < 0:
+            return None
+        return target
+
+
+def build_double_array(nodelist, node_childrens):
+    ''' Build a `DoubleArrayTrie` from the tree of `build_tree()`.
+    '''
+    alphabet = sorted(set(
+        codepoint
+        for children in node_childrens
+        for codepoint, child in children
+    ))
+    codes = dict(
+        (codepoint, code)
+        for code, codepoint in enumerate(alphabet, 1)
+    )
+    max_code = len(alphabet)
+
+    # 자식 칸들만 겹치지 않으면 되므로 base 는 어떤 순서로 정해도 된다.
+    # 자식이 많은 노드부터 놓아야 빈 칸을 찾는 데 덜 헤맨다.
+    used = bytearray(len(nodelist) + max_code + 1)
+    used[0] = 1                 # 루트
+    # 여러 번 헛짚은 빈 칸은 첫 자식의 후보에서 뺀다. (darts-clone 처럼)
+    blocked = bytearray(used)
+    failures = bytearray(len(used))
+    node_bases = [0] * len(nodelist)
+    first_free = 1
+    order = sorted(
+        (node_index for node_index, children in enumerate(node_childrens)
+         if children),
+        key=lambda node_index: -len(node_childrens[node_index]),
+    )
+    for node_index in order:
+        child_codes = [
+            codes[codepoint] for codepoint, child in node_childrens[node_index]
+        ]
+        # 첫 자식이 들어갈 빈 칸을 차례로 살펴서, 자식들이 모두 빈 칸에
+        # 들어가는 가장 작은 base 를 찾는다.
+        first_code = child_codes[0]
+        other_codes = child_codes[1:]
+        free = max(first_free, first_code + 1)
+        while True:
+            free = blocked.find(0, free)
+            if free < 0 or free - first_code + max_code >= len(used):
+                if free < 0:
+                    free = len(used)
+                grow = len(used)
+                used.extend(bytearray(grow))
+                blocked.extend(bytearray(grow))
+                failures.extend(bytearray(grow))
+                continue
+            next_base = free - first_code
+            for code in other_codes:
+                if used[next_base + code]:
+                    break
+            else:
+                break
+            failures[free] += 1
+            if failures[free] >= MAX_FAILURES:
+                blocked[free] = 1
+            free += 1
+
+        node_bases[node_index] = next_base
+        for code in child_codes:
+            used[next_base + code] = 1
+            blocked[next_base + code] = 1
+        first_free = blocked.find(0, first_free)
+        if first_free < 0:
+            first_free = len(blocked)
+
+    # base[s] + c 가 늘 범위 안에 있도록 한다.
+    size = max(node_bases) + max_code + 1
+    base = array('i', [0]) * size
+    check = array('i', [-1]) * size
+    targets = array('i', [-1]) * size
+
+    root = nodelist[0]
+    if root.target is not None:
+        targets[0] = root.target
+
+    # build_tree() 는 부모를 자식보다 먼저 만드므로 번호 순서대로 보면
+    # 부모의 칸이 늘 먼저 정해진다.
+    slots = [0] * len(nodelist)     # 노드 번호 -> 칸
+    for node_index, children in enumerate(node_childrens):
+        if not children:
+            continue
+        slot = slots[node_index]
+        next_base = node_bases[node_index]
+        base[slot] = next_base
+        for codepoint, child in children:
+            child_slot = next_base + codes[codepoint]
+            check[child_slot] = slot
+            target = nodelist[child].target
+            if target is not None:
+                targets[child_slot] = target
+            slots[child] = child_slot
+
+    return DoubleArrayTrie(array('i', alphabet), base, check, targets)
+
+
+class DoubleArrayEncoder(Encoder):
+    ''' `Encoder` running on a `DoubleArrayTrie`.
+
+    :param trie: a `DoubleArrayTrie`, e.g. from `build_double_array()` or
+        `load_tree_as_double_array()`.
+    '''
+
+    __slots__ = (
+        'trie',
+    )
+
+    def __init__(self, trie):
+        self.trie = trie
+
+    @classmethod
+    def from_tree(cls, nodelist, node_childrens):
+        return cls(build_double_array(nodelist, node_childrens))
+
+    def __repr__(self):
+        return '{}({!r})'.format(
+            type(self).__name__,
+            self.trie,
+        )
+
+    def scan(self, state, codepoints, final):
+        trie = self.trie
+        get_code = trie.codes.get
+        base = trie.base
+        check = trie.check
+
+        def step(slot, codepoint):
+            code = get_code(codepoint)
+            if code is not None:
+                child = base[slot] + code
+                if check[child] == slot:
+                    return child
+            return 0
+        return scan_longest_match(
+            state, codepoints, final, step, trie.targets, base,
+        )
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+import itertools
+import sys
+
+from .models import Mapping
+from .tree import build_tree
+
+
+PY3 = sys.version_info.major == 3
+
+if PY3:
+    unichr = chr
+
+
+class Encoder(object):
+    ''' Unicode Jamo to Hanyang PUA encoder.
+
+    Walks the tree from `build_tree()` and replaces the longest Jamo
+    sequence at each position with the PUA codepoint of the matched node.
+    Codepoints which do not start any sequence are passed through.
+
+    :param nodelist: nodes as returned by `build_tree()`.
+    :param node_childrens: children of the nodes as returned by
+        `build_tree()` or `build_tree_children_list()`.
+    '''
+
+    __slots__ = (
+        'targets',
+        'transitions',
+    )
+
+    def __init__(self, nodelist, node_childrens):
+        targets = [
+            -1 if node.target is None else node.target for node in nodelist
+        ]
+        # 루트의 target 은 빈 자모열에 대응하므로 쓰지 않는다.
+        targets[0] = -1
+        self.targets = tuple(targets)
+        self.transitions = tuple(
+            dict(children) for children in node_childrens
+        )
+
+    @classmethod
+    def from_tree(cls, nodelist, node_childrens):
+        return cls(nodelist, node_childrens)
+
+    @classmethod
+    def from_transitions(cls, targets, transitions):
+        ''' Make an encoder of the `targets` and `transitions` of another.
+        '''
+        encoder = cls.__new__(cls)
+        encoder.targets = targets
+        encoder.transitions = transitions
+        return encoder
+
+    @classmethod
+    def from_mappings(cls, mappings):
+        ''' Build an encoder from PUA-to-Jamo table mappings.
+
+        :param mappings: an iterable of `Mapping`, the same as for `Decoder`.
+        '''
+        mappings = (
+            Mapping(
+                source=mapping.target,
+                target=mapping.source[0],
+                comment=None,
+            )
+            for mapping in mappings
+            if isinstance(mapping, Mapping)
+        )
+        nodelist, node_childrens = build_tree(mappings)
+        return cls.from_tree(nodelist, node_childrens)
+
+    def __repr__(self):
+        return '{}(<{} nodes>)'.format(
+            type(self).__name__,
+            len(self.targets),
+        )
+
+    def encode(self, text):
+        codepoints = [ord(char) for char in text]
+        codepoints = IncrementalEncoder(self).scan(codepoints, final=True)
+        return u''.join(unichr(code) for code in codepoints)
+
+    def encode_codepoints(self, codepoints, chunk_size=8192):
+        incrementalEncoder = IncrementalEncoder(self)
+        codepoints = iter(codepoints)
+        while True:
+            chunk = list(itertools.islice(codepoints, chunk_size))
+            if not chunk:
+                break
+            for code in incrementalEncoder.feed(chunk):
+                yield code
+        for code in incrementalEncoder.flush():
+            yield code
+
+    def scan(self, state, codepoints, final):
+        ''' Scan `codepoints`, which starts with the pending `state.path`.
+
+        :param state: an `IncrementalEncoder`, which is updated.
+        :returns: a list of output codepoints.
+        '''
+        transitions = self.transitions
+
+        def step(node_index, codepoint):
+            return transitions[node_index].get(codepoint)
+        return scan_longest_match(
+            state, codepoints, final, step, self.targets, transitions,
+        )
+
+
+def scan_longest_match(state, codepoints, final, step, targets, branches):
+    ''' Replace the longest match at each position of `codepoints`.
+
+    This is the scan of every encoder, which differ only in the tree they
+    walk. The root is the node 0, which is never a child.
+
+    :param state: an `IncrementalEncoder`, which is updated.
+    :param codepoints: starts with the pending `state.path`.
+    :param step: ``step(node, codepoint)``, the child of the node by the
+        codepoint, or a false value if there is none.
+    :param targets: the target of each node, or -1.
+    :param branches: true for each node which has children.
+    :returns: a list of output codepoints.
+    '''
+    output = []
+    emit = output.append
+    n = len(codepoints)
+    start = 0               # codepoints[start:i] 가 현재 경로
+    i = len(state.path)
+    node = state.node_index
+    match_target = state.match_target   # 현재 경로 위의 가장 긴 일치
+    match_length = state.match_length
+
+    while True:
+        if i < n:
+            codepoint = codepoints[i]
+            child = step(node, codepoint)
+            if child:
+                i += 1
+                target = targets[child]
+                if target >= 0:
+                    if not branches[child]:
+                        # 잎 노드: 더 긴 일치가 없으므로 바로 내보낸다.
+                        emit(target)
+                        start = i
+                        node = 0
+                        match_length = 0
+                        continue
+                    match_target = target
+                    match_length = i - start
+                node = child
+                continue
+            if i == start:
+                emit(codepoint)
+                i += 1
+                start = i
+                continue
+        elif not final or i == start:
+            break
+        # 더 나아갈 수 없으면 가장 긴 일치를 내보내고, 그 뒤에 읽은
+        # 것들은 루트에서부터 다시 읽는다.
+        if match_length:
+            emit(match_target)
+            start += match_length
+        else:
+            emit(codepoints[start])
+            start += 1
+        i = start
+        node = 0
+        match_length = 0
+
+    state.node_index = node
+    state.path = codepoints[start:]
+    state.match_target = match_target
+    state.match_length = match_length
+    return output
+
+
+class IncrementalEncoder(object):
+    ''' Encoder for input which arrives in chunks.
+
+    Keeps the position in the tree and the codepoints read since the last
+    output across `feed()` calls, so that a Jamo sequence split between
+    chunks is encoded the same as in one piece. Call `flush()` at the end
+    of the input.
+
+    :param encoder: an `Encoder`.
+    '''
+
+    __slots__ = (
+        'encoder',
+        'node_index',
+        'path',
+        'match_target',
+        'match_length',
+    )
+
+    def __init__(self, encoder):
+        self.encoder = encoder
+        self.reset()
+
+    def reset(self):
+        self.node_index = 0
+        self.path = []          # 마지막 출력 이후 읽은 코드포인트
+        self.match_target = None
+        self.match_length = 0
+
+    def feed(self, codepoints):
+        return self.scan(self.path + list(codepoints), final=False)
+
+    def flush(self):
+        return self.scan(self.path, final=True)
+
+    def scan(self, codepoints, final):
+        return self.encoder.scan(self, codepoints, final)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2017 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Streaming of top-level JSON arrays, and columnar JSON documents. '''
+from __future__ import absolute_import
+from __future__ import print_function
+import json
+import re
+
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# 열 배치 문서의 "layout"
+COLUMNS = 'columns'
+
+
+def sniff_json(input_fp):
+    ''' Read up to the first non-whitespace character of a JSON text.
+
+    :returns: what has been read, to be passed on as ``prefix``.
+    '''
+    prefix = ''
+    while True:
+        char = input_fp.read(1)
+        prefix += char
+        if not char or not char.isspace():
+            return prefix
+
+
+def iter_json_array(input_fp, chunk_size=CHUNK_SIZE, prefix=''):
+    ''' Yield the elements of the top-level JSON array of a text file.
+
+    The file is read in chunks of ``chunk_size`` characters, and each
+    element is decoded by `json.JSONDecoder.raw_decode()` as soon as it is
+    complete, so only one element is held at a time.
+
+    :param prefix: what has already been read from the file.
+    '''
+    decoder = json.JSONDecoder()
+    buffer = prefix
+    pos = 0
+    eof = False
+    need_more = True
+    started = False
+    expect_value = True
+    first = True
+    while True:
+        if need_more:
+            if eof:
+                raise ValueError('unexpected end of JSON array')
+            chunk = input_fp.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            need_more = False
+
+        pos = WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            need_more = True
+            continue
+        char = buffer[pos]
+
+        if not started:
+            if char != '[':
+                raise ValueError('not a JSON array')
+            started = True
+            pos += 1
+        elif not expect_value:
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(
+                    'expected , or ] at {!r}'.format(buffer[pos:pos + 16])
+                )
+            expect_value = True
+            pos += 1
+        elif char == ']' and first:
+            return
+        else:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if eof:
+                    raise
+                need_more = True
+                continue
+            # 숫자 같은 값은 버퍼 끝에서 잘렸을 수 있으므로, 뒤따르는
+            # , 나 ] 까지 읽혀 있어야 받아들인다.
+            if not eof:
+                after = WHITESPACE.match(buffer, end).end()
+                if after == len(buffer) or buffer[after] not in ',]':
+                    need_more = True
+                    continue
+            yield value
+            pos = end
+            expect_value = False
+            first = False
+
+
+def dump_json_array(values, output_fp, compact=False):
+    ''' Write a JSON array, one element at a time.
+
+    The output is the same as of ``json.dump(list(values), output_fp,
+    indent=2, sort_keys=True)``, or, if ``compact``, without indentation,
+    whitespace and key sorting.
+
+    :returns: the number of the elements.
+    '''
+    if compact:
+        encoder = json.JSONEncoder(separators=(',', ':'))
+        opening, separator, closing = '[', ',', ']'
+    else:
+        encoder = json.JSONEncoder(indent=2, sort_keys=True)
+        opening, separator, closing = '[\n  ', ',\n  ', '\n]'
+    write = output_fp.write
+
+    n = 0
+    for n, value in enumerate(values, 1):
+        write(opening if n == 1 else separator)
+        text = encoder.encode(value)
+        if not compact:
+            text = text.replace('\n', '\n  ')
+        write(text)
+    write(closing if n else '[]')
+    return n
+
+
+def load_json_columns(text, names):
+    ''' Load a columnar JSON document.
+
+    It is an object of ``"layout": "columns"`` and parallel arrays.
+
+    :returns: the arrays of ``names``, in that order.
+    '''
+    document = json.loads(text)
+    if not isinstance(document, dict) or document.get('layout') != COLUMNS:
+        raise ValueError('not a columnar JSON document')
+    try:
+        return [document[name] for name in names]
+    except KeyError as e:
+        raise ValueError('missing column: {}'.format(e.args[0]))
+
+
+def dump_json_columns(columns, output_fp):
+    ''' Write a columnar JSON document, without whitespace.
+
+    :param columns: a dict of the arrays.
+    '''
+    document = dict(columns, layout=COLUMNS)
+    json.dump(document, output_fp, separators=(',', ':'), sort_keys=True)
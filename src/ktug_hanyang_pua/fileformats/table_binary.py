@@ -16,13 +16,50 @@
 #   You should have received a copy of the GNU Affero General Public License
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+''' Table binary formats.
+
+Version 1 is made of ushorts::
+
+    number of groups
+    groups      group start, group length (x groups)
+    lengths     target length (x mappings)
+    targets     target codepoints
+
+Version 2 has a header, and the offsets of the targets so that any of them
+can be found without reading the others. All values are little-endian::
+
+    header      magic 'KHTB', version (uint16), reserved (uint16),
+                number of groups, mappings and target codepoints (uint32 x 3),
+                offsets of groups, lengths, offsets and targets (uint32 x 4)
+    groups      group start, group length (uint32 x 2 x groups)
+    lengths     (uint32 x mappings)
+    offsets     target of mapping i is targets[offsets[i]:offsets[i] +
+                lengths[i]] (uint32 x mappings)
+    targets     (uint32 x target codepoints)
+
+Every section is 4-byte aligned, so that `BinaryTable` can use the arrays of
+a `mmap` in place. Version 1 could start like the magic only with 0x484B
+groups, the first starting at U+4254.
+
+In version 2, groups may span holes between the mappings, to have fewer of
+them: a hole has the length 0xFFFF and no target codepoints. The number of
+mappings in the header counts the holes as well. Version 1 has no holes,
+since its readers would take 0xFFFF for the length of a target.
+'''
 from __future__ import absolute_import
 from __future__ import print_function
+from array import array
+from bisect import bisect_right
+from heapq import merge
+from shutil import copyfileobj
+from tempfile import SpooledTemporaryFile
+from tempfile import TemporaryFile
 import logging
 import struct
+import sys
 
 from ..models import Mapping
-from ..table import split_table
+from ..table import fill_holes
 from ..table import make_groups
 
 
@@ -32,6 +69,26 @@ logger = logging.getLogger(__name__)
 ushort = struct.Struct('<H')
 ushort_pair = struct.Struct('<2H')
 
+MAGIC = b'KHTB'
+VERSION = 2
+
+header_struct = struct.Struct('<4sHH3I4I')
+
+LITTLE_ENDIAN = sys.byteorder == 'little'
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# 예산을 나누어 쓰는 것들: 정렬하는 run 과 세 구획의 임시 파일
+BUDGET_SHARES = 4
+
+# 메모리에 올린 매핑 하나가 target 말고 차지하는 대강의 바이트 수
+MAPPING_SIZE = 160
+
+CHUNK_SIZE = 8192
+
+# 그룹 안의 빈 자리의 target 길이
+HOLE = 0xFFFF
+
 
 def read_struct(fp, struct):
     data = fp.read(struct.size)
@@ -43,58 +100,271 @@ def write_struct(fp, struct, tpl):
     fp.write(data)
 
 
-def load_mappings_as_binary_table(input_fp):
+def entry_length(target):
+    ''' Target length of an entry, or `HOLE` if ``target`` is None. '''
+    if target is None:
+        return HOLE
+    if len(target) >= HOLE:
+        raise ValueError('too long target: {}'.format(len(target)))
+    return len(target)
 
-    # 그룹 갯수
-    n_groups = read_struct(input_fp, ushort)[0]
 
-    # 그룹
-    groupheaders = [
-        read_struct(input_fp, ushort_pair)
-        for i in range(n_groups)
-    ]
+def count_targets(lengths):
+    ''' Number of the target codepoints of the entries. '''
+    return sum(length for length in lengths if length != HOLE)
 
-    # 매핑
-    mappings = []
-    mappingtargetlen_struct = struct.Struct('<H')
-    for groupstart, grouplength in groupheaders:
-        for i in range(grouplength):
-            source = groupstart + i
-            targetlen = read_struct(input_fp, mappingtargetlen_struct)[0]
-            mapping = Mapping(
-                source=source,
-                target=targetlen,
-                comment=None,
+
+def as_buffer(input):
+    ''' View a buffer such as `bytes` or `mmap` in place, or read a file.
+    '''
+    try:
+        return memoryview(input)
+    except TypeError:
+        return memoryview(input.read())
+
+
+def cast_array(buffer, typecode):
+    ''' View a little-endian buffer as an array. '''
+    itemsize = struct.calcsize(typecode)
+    buffer = buffer[:len(buffer) - len(buffer) % itemsize]
+    if LITTLE_ENDIAN:
+        return buffer.cast(typecode)
+    values = array(typecode, buffer.tobytes())
+    values.byteswap()
+    return values
+
+
+class BinaryTable(object):
+    ''' Random access to a binary table.
+
+    Only the group headers are read at first. A lookup finds the group of
+    the codepoint by bisection. The offsets of the targets are read from a
+    version 2 table, or summed up from their lengths on the first lookup.
+
+    A group may span holes, the entries of the length `HOLE`. Lookups
+    report them as missing: ``table[codepoint]`` raises `KeyError` and
+    `get()` returns the default.
+
+    :param input: a binary file, or a buffer such as `bytes` or `mmap`.
+        The sections of a buffer are used in place on little-endian hosts.
+    '''
+
+    __slots__ = (
+        'groupstarts',
+        'grouplengths',
+        'groupbases',
+        'lengths',
+        'targets',
+        '_offsets',
+        '_n_holes',
+    )
+
+    def __init__(self, input):
+        buffer = as_buffer(input)
+        self._offsets = None
+        self._n_holes = None
+        if buffer[:len(MAGIC)].tobytes() == MAGIC:
+            self._init_v2(buffer)
+            return
+        if len(buffer) < ushort.size:
+            raise ValueError('truncated binary table')
+
+        # 그룹 갯수
+        n_groups = ushort.unpack_from(buffer)[0]
+
+        # 그룹
+        offset = ushort.size
+        headers = cast_array(buffer[offset:offset + n_groups * 4], 'H')
+        if len(headers) != n_groups * 2:
+            raise ValueError('truncated binary table')
+        offset += n_groups * 4
+        n_mappings = self._init_groups(headers)
+
+        # 매핑
+        self.lengths = cast_array(
+            buffer[offset:offset + n_mappings * 2], 'H'
+        )
+        if len(self.lengths) != n_mappings:
+            raise ValueError('truncated binary table')
+        offset += n_mappings * 2
+
+        # 자모 문자열
+        self.targets = cast_array(buffer[offset:], 'H')
+
+    def _init_v2(self, buffer):
+        if len(buffer) < header_struct.size:
+            raise ValueError('truncated binary table')
+        header = header_struct.unpack_from(buffer)
+        magic, version, __, n_groups, n_mappings, n_targets = header[:6]
+        if version != VERSION:
+            raise ValueError('unsupported version: {}'.format(version))
+
+        sections = []
+        for offset, n in zip(header[6:], (
+            n_groups * 2,
+            n_mappings,
+            n_mappings,
+            n_targets,
+        )):
+            section = buffer[offset:offset + n * 4]
+            if len(section) != n * 4:
+                raise ValueError('truncated binary table')
+            sections.append(cast_array(section, 'I'))
+        headers, self.lengths, self._offsets, self.targets = sections
+        if self._init_groups(headers) != n_mappings:
+            raise ValueError('inconsistent binary table')
+
+    def _init_groups(self, headers):
+        self.groupstarts = headers[0::2]
+        self.grouplengths = headers[1::2]
+        groupbases = []
+        n_mappings = 0
+        for grouplength in self.grouplengths:
+            groupbases.append(n_mappings)
+            n_mappings += grouplength
+        self.groupbases = groupbases
+        return n_mappings
+
+    def __repr__(self):
+        return '{}(<{} groups>, <{} mappings>)'.format(
+            type(self).__name__,
+            len(self.groupstarts),
+            len(self),
+        )
+
+    def __len__(self):
+        if self._n_holes is None:
+            self._n_holes = sum(
+                1 for length in self.lengths if length == HOLE
             )
-            mappings.append(mapping)
+        return len(self.lengths) - self._n_holes
 
-    # 자모 문자열
-    for mapping in mappings:
-        target_struct = struct.Struct('<{}H'.format(mapping.target))
-        target = read_struct(input_fp, target_struct)
-        source = (mapping.source,)
-        yield Mapping(source=source, target=target, comment=None)
+    def __iter__(self):
+        for source, length in zip(self.iter_entries(), self.lengths):
+            if length != HOLE:
+                yield source
+
+    def iter_entries(self):
+        ''' Iterate over the sources of the entries, holes included. '''
+        for groupstart, grouplength in zip(
+            self.groupstarts, self.grouplengths
+        ):
+            for source in range(groupstart, groupstart + grouplength):
+                yield source
+
+    def __contains__(self, codepoint):
+        return self.index(codepoint) >= 0
+
+    def __getitem__(self, codepoint):
+        i = self.index(codepoint)
+        if i < 0:
+            raise KeyError(codepoint)
+        offsets = self.offsets
+        start = offsets[i]
+        end = start + self.lengths[i]
+        if end > len(self.targets):
+            raise ValueError('truncated binary table')
+        return tuple(self.targets[start:end])
 
-    remaining = input_fp.read()
-    if len(remaining) != 0:
-        logger.warning('remaining data: %s bytes', len(remaining))
+    def items(self):
+        ''' Iterate over the sources and their targets, in order.
 
+        Unlike lookups, this reads the whole targets section at once.
+        '''
+        lengths = self.lengths
+        if count_targets(lengths) > len(self.targets):
+            raise ValueError('truncated binary table')
+        targets = self.targets.tolist()
+        sources = self.iter_entries()
+        if self._offsets is None:
+            start = 0
+            for source, length in zip(sources, lengths):
+                if length == HOLE:
+                    continue
+                end = start + length
+                yield source, tuple(targets[start:end])
+                start = end
+        else:
+            for source, start, length in zip(sources, self._offsets, lengths):
+                if length == HOLE:
+                    continue
+                yield source, tuple(targets[start:start + length])
 
-def dump_mappings_as_binary_table(mappings, output_fp):
+    def get(self, codepoint, default=None):
+        try:
+            return self[codepoint]
+        except KeyError:
+            return default
 
-    mappings = (
-        Mapping(
-            source=m.source[0],
-            target=m.target,
-            comment=m.comment,
+    def index(self, codepoint):
+        ''' Index of the mapping of the codepoint, or -1. '''
+        groupstarts = self.groupstarts
+        g = bisect_right(groupstarts, codepoint) - 1
+        if g < 0:
+            return -1
+        i = codepoint - groupstarts[g]
+        if i >= self.grouplengths[g]:
+            return -1
+        i += self.groupbases[g]
+        if self.lengths[i] == HOLE:
+            return -1
+        return i
+
+    @property
+    def offsets(self):
+        if self._offsets is None:
+            offsets = array('L', [0]) * len(self.lengths)
+            offset = 0
+            for i, length in enumerate(self.lengths):
+                offsets[i] = offset
+                if length != HOLE:
+                    offset += length
+            self._offsets = offsets
+        return self._offsets
+
+
+def load_mappings_as_binary_table(input_fp):
+    ''' Load mappings of a binary table of either version.
+
+    The file is read at once, and its sections are parsed as arrays.
+    '''
+    table = BinaryTable(input_fp.read())
+    for source, target in table.items():
+        yield Mapping((source,), target, None)
+
+    remaining = len(table.targets) - count_targets(table.lengths)
+    if remaining != 0:
+        logger.warning(
+            'remaining data: %s bytes', remaining * table.targets.itemsize
         )
+
+
+def dump_mappings_as_binary_table(mappings, output_fp, version=1,
+                                  memory_budget=None, max_gap=0):
+    ''' Dump mappings as a binary table.
+
+    :param version: 1 or 2.
+    :param memory_budget: if given, dump in bounded memory with
+        `stream_mappings_as_binary_table()`.
+    :param max_gap: merge the groups which are at most this many
+        codepoints apart, with holes between them; version 2 only.
+    :returns: the numbers of the groups and the mappings.
+    '''
+    check_max_gap(version, max_gap)
+    if memory_budget is not None:
+        return stream_mappings_as_binary_table(
+            mappings, output_fp, version, memory_budget, max_gap,
+        )
+    if version == VERSION:
+        return dump_mappings_as_binary_table_v2(mappings, output_fp, max_gap)
+    if version != 1:
+        raise ValueError('unsupported version: {}'.format(version))
+
+    mappings = sorted(
+        (m.source[0], tuple(m.target))
         for m in mappings
     )
-    mappings = sorted(mappings)
-    mappings = list(mappings)
-    groups = make_groups(m.source for m in mappings)
-    mappings = split_table(mappings)
-    mappings = list(mappings)
+    groups = make_groups(source for source, target in mappings)
 
     # 그룹 갯수
     n_groups = len(groups)
@@ -107,14 +377,242 @@ def dump_mappings_as_binary_table(mappings, output_fp):
 
     # 매핑
     targets = []
-    for mapping, target, comment in mappings:
+    for source, target in mappings:
+        write_struct(output_fp, ushort, (entry_length(target), ))
         targets.extend(target)
-    for n_mappings, mapping in enumerate(mappings, 1):
-        mapping, target, comment = mapping
-        write_struct(output_fp, ushort, (mapping.target, ))  # target length
 
     # 자모 문자열
     targetfmt = '<{}H'.format(len(targets))
     target = struct.pack(targetfmt, *targets)
     output_fp.write(target)
-    return n_groups, n_mappings
+    return n_groups, len(mappings)
+
+
+def check_max_gap(version, max_gap):
+    ''' Holes are only in version 2. '''
+    if max_gap < 0:
+        raise ValueError('max_gap should not be negative: {}'.format(max_gap))
+    if max_gap and version != VERSION:
+        raise ValueError(
+            'max_gap needs version {}: {}'.format(VERSION, version)
+        )
+
+
+def dump_mappings_as_binary_table_v2(mappings, output_fp, max_gap=0):
+    mappings = sorted(
+        (m.source[0], tuple(m.target))
+        for m in mappings
+    )
+    entries = list(fill_holes(mappings, max_gap))
+    groups = make_groups(source for source, target in entries)
+
+    headers = array('I')
+    for groupstart, groupend in groups:
+        headers.append(groupstart)
+        headers.append(groupend - groupstart + 1)
+    lengths = array('I')
+    offsets = array('I')
+    targets = array('I')
+    for source, target in entries:
+        lengths.append(entry_length(target))
+        offsets.append(len(targets))
+        if target is not None:
+            targets.extend(target)
+
+    sections = (headers, lengths, offsets, targets)
+    section_offsets = []
+    offset = header_struct.size
+    for section in sections:
+        section_offsets.append(offset)
+        offset += len(section) * 4
+
+    header = header_struct.pack(
+        MAGIC, VERSION, 0, len(groups), len(entries), len(targets),
+        *section_offsets
+    )
+    output_fp.write(header)
+    for section in sections:
+        if not LITTLE_ENDIAN:
+            section.byteswap()
+        output_fp.write(section.tobytes())
+    return len(groups), len(mappings)
+
+
+def stream_mappings_as_binary_table(mappings, output_fp, version=1,
+                                    memory_budget=DEFAULT_MEMORY_BUDGET,
+                                    max_gap=0):
+    ''' Dump mappings as a binary table in bounded memory.
+
+    The mappings are sorted in runs. If there are more than one, they are
+    spilled to temporary files and merged. The sections are then streamed
+    to temporary files, since the group headers come before them. A run
+    and the temporary files of the three sections are all alive at once,
+    so each of them is kept in memory up to a quarter of ``memory_budget``
+    bytes. The output is the same as of `dump_mappings_as_binary_table()`.
+
+    :returns: the numbers of the groups and the mappings.
+    '''
+    if version not in (1, VERSION):
+        raise ValueError('unsupported version: {}'.format(version))
+    check_max_gap(version, max_gap)
+    # 0 이면 SpooledTemporaryFile 이 디스크로 넘기지 않는다.
+    share = max(memory_budget // BUDGET_SHARES, 1)
+    mappings = iter_sorted_mappings(mappings, share)
+    try:
+        return write_sorted_mappings(
+            fill_holes(mappings, max_gap), output_fp, version, share,
+        )
+    finally:
+        mappings.close()
+
+
+def iter_sorted_mappings(mappings, memory_budget):
+    ''' Sort mappings into ``(source, target)`` pairs by external merge.
+    '''
+    runs = []
+    try:
+        run = []
+        size = 0
+        for mapping in mappings:
+            target = tuple(mapping.target)
+            run.append((mapping.source[0], target))
+            size += MAPPING_SIZE + 8 * len(target)
+            if size >= memory_budget:
+                run.sort()
+                runs.append(spill_run(run))
+                run = []
+                size = 0
+        run.sort()
+        if not runs:
+            for pair in run:
+                yield pair
+            return
+        if run:
+            runs.append(spill_run(run))
+        del run
+        logger.info('merging %s sorted runs', len(runs))
+        for pair in merge(*[read_run(fp) for fp in runs]):
+            yield pair
+    finally:
+        for fp in runs:
+            fp.close()
+
+
+def spill_run(run):
+    ''' Write a sorted run to a temporary file.
+
+    Each mapping is written as its source, target length and target
+    codepoints, in native uint32s.
+    '''
+    fp = TemporaryFile()
+    words = array('I')
+    for source, target in run:
+        words.append(source)
+        words.append(len(target))
+        words.extend(target)
+        if len(words) >= CHUNK_SIZE:
+            fp.write(words.tobytes())
+            del words[:]
+    fp.write(words.tobytes())
+    return fp
+
+
+def read_run(fp):
+    fp.seek(0)
+    words = array('I')
+    while True:
+        data = fp.read(CHUNK_SIZE * words.itemsize)
+        words.frombytes(data)
+        n = len(words)
+        i = 0
+        while i + 2 <= n:
+            end = i + 2 + words[i + 1]
+            if end > n:
+                break
+            yield words[i], tuple(words[i + 2:end])
+            i = end
+        del words[:i]
+        if not data:
+            break
+    if words:
+        raise ValueError('truncated sorted run')
+
+
+def write_array(fp, values):
+    if not LITTLE_ENDIAN:
+        values.byteswap()
+    fp.write(values.tobytes())
+
+
+def write_sorted_mappings(mappings, output_fp, version, memory_budget):
+    typecode = 'H' if version == 1 else 'I'
+    lengths_fp = SpooledTemporaryFile(max_size=memory_budget)
+    offsets_fp = SpooledTemporaryFile(max_size=memory_budget)
+    targets_fp = SpooledTemporaryFile(max_size=memory_budget)
+    if version == 1:
+        sections = [lengths_fp, targets_fp]
+    else:
+        sections = [lengths_fp, offsets_fp, targets_fp]
+
+    def flush(lengths, offsets, targets):
+        write_array(lengths_fp, lengths)
+        if version != 1:
+            write_array(offsets_fp, offsets)
+        write_array(targets_fp, targets)
+
+    try:
+        groups = []
+        lengths = array(typecode)
+        offsets = array('I')
+        targets = array(typecode)
+        n_entries = 0
+        n_holes = 0
+        n_targets = 0
+        for source, target in mappings:
+            if groups and groups[-1][1] + 1 == source:
+                groups[-1][1] = source
+            else:
+                groups.append([source, source])
+            lengths.append(entry_length(target))
+            offsets.append(n_targets)
+            if target is None:
+                n_holes += 1
+            else:
+                targets.extend(target)
+                n_targets += len(target)
+            n_entries += 1
+            if len(lengths) >= CHUNK_SIZE or len(targets) >= CHUNK_SIZE:
+                flush(lengths, offsets, targets)
+                lengths = array(typecode)
+                offsets = array('I')
+                targets = array(typecode)
+        flush(lengths, offsets, targets)
+
+        headers = array(typecode)
+        for groupstart, groupend in groups:
+            headers.append(groupstart)
+            headers.append(groupend - groupstart + 1)
+
+        if version == 1:
+            write_struct(output_fp, ushort, (len(groups), ))
+        else:
+            offset = header_struct.size
+            section_offsets = [offset]
+            offset += len(headers) * 4
+            for n in (n_entries, n_entries, n_targets):
+                section_offsets.append(offset)
+                offset += n * 4
+            header = header_struct.pack(
+                MAGIC, VERSION, 0, len(groups), n_entries, n_targets,
+                *section_offsets
+            )
+            output_fp.write(header)
+        write_array(output_fp, headers)
+        for fp in sections:
+            fp.seek(0)
+            copyfileobj(fp, output_fp)
+        return len(groups), n_entries - n_holes
+    finally:
+        lengths_fp.close()
+        offsets_fp.close()
+        targets_fp.close()
@@ -18,15 +18,31 @@
 #
 from __future__ import absolute_import
 from __future__ import print_function
-import json
 
 from ..formats import MappingDictFormat
+from ..models import Comment
 from ..models import Mapping
+from .json_array import dump_json_array
+from .json_array import dump_json_columns
+from .json_array import iter_json_array
+from .json_array import load_json_columns
+from .json_array import sniff_json
 
 
 def load_mappings_as_json_table(input_fp):
+    ''' Load mappings of a JSON table, one at a time.
+
+    The columnar layout of `dump_mappings_as_json_columns()` is detected.
+    '''
+    prefix = sniff_json(input_fp)
+    if prefix.endswith('{'):
+        return load_mappings_as_json_columns(prefix + input_fp.read())
+    return load_mappings_as_json_records(input_fp, prefix)
+
+
+def load_mappings_as_json_records(input_fp, prefix=''):
     mappingDictFormat = MappingDictFormat()
-    mappings = json.load(input_fp)
+    mappings = iter_json_array(input_fp, prefix=prefix)
     for mapping in mappings:
         mapping = mappingDictFormat.parse(mapping)
         mapping = Mapping(
@@ -37,7 +53,32 @@ def load_mappings_as_json_table(input_fp):
         yield mapping
 
 
-def dump_mappings_as_json_table(mappings, output_fp):
+def load_mappings_as_json_columns(text):
+    sources, lengths, targets, comments = load_json_columns(
+        text, ('sources', 'lengths', 'targets', 'comments'),
+    )
+    if not len(sources) == len(lengths) == len(comments):
+        raise ValueError('columns should have the same length')
+    start = 0
+    for source, length, comment in zip(sources, lengths, comments):
+        end = start + length
+        if comment is not None:
+            comment = Comment(comment)
+        yield Mapping((source,), tuple(targets[start:end]), comment)
+        start = end
+
+
+def dump_mappings_as_json_table(mappings, output_fp, compact=False,
+                                columnar=False):
+    ''' Write mappings as a JSON table, one at a time.
+
+    :param compact: without indentation, whitespace and key sorting.
+    :param columnar: in the columnar layout of
+        `dump_mappings_as_json_columns()`.
+    :returns: the number of the mappings.
+    '''
+    if columnar:
+        return dump_mappings_as_json_columns(mappings, output_fp)
     mappingDictFormat = MappingDictFormat()
     mappings = (
         Mapping(
@@ -46,9 +87,38 @@ def dump_mappings_as_json_table(mappings, output_fp):
             comment=mapping.comment,
         ) for mapping in mappings
     )
-    mappings = [
+    mappings = (
         mappingDictFormat.format(mapping)
         for mapping in mappings
-    ]
-    json.dump(mappings, output_fp, indent=2, sort_keys=True)
-    return len(mappings)
+    )
+    return dump_json_array(mappings, output_fp, compact=compact)
+
+
+def dump_mappings_as_json_columns(mappings, output_fp):
+    ''' Write mappings as a JSON table in the columnar layout.
+
+    It is an object of parallel arrays: ``sources``, target ``lengths``
+    and comment texts (``comments``, null for none), and ``targets``
+    concatenated.
+
+    :returns: the number of the mappings.
+    '''
+    sources = []
+    lengths = []
+    targets = []
+    comments = []
+    for mapping in mappings:
+        sources.append(mapping.source[0])
+        lengths.append(len(mapping.target))
+        targets.extend(mapping.target)
+        comment = mapping.comment
+        if comment is not None:
+            comment = comment.text
+        comments.append(comment)
+    dump_json_columns({
+        'sources': sources,
+        'lengths': lengths,
+        'targets': targets,
+        'comments': comments,
+    }, output_fp)
+    return len(sources)
@@ -18,12 +18,95 @@
 #
 from __future__ import absolute_import
 from __future__ import print_function
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
 
 from ..formats import IterableFormat
 from ..formats import LineFormat
+from ..models import Comment
+from ..models import EMPTY
+from ..models import Mapping
 
 
-def load_mappings_as_text_table(input_fp):
+CHUNK_SIZE = 10000
+
+# 작업 프로세스마다 읽어 두는 덩어리 수
+CHUNKS_PER_JOB = 2
+
+# 작업 프로세스마다 하나씩 만든다.
+_lineFormat = None
+
+
+def parse_lines(lines):
+    ''' Parse lines into plain values, which are cheaper to pickle.
+
+    A `Mapping` becomes a tuple of its source, target and comment text, a
+    `Comment` its text, and `EMPTY` None. See `unpack_lines()`.
+    '''
+    global _lineFormat
+    if _lineFormat is None:
+        _lineFormat = LineFormat()
+    parsed = []
+    for line in lines:
+        line = _lineFormat.parse(line)
+        if isinstance(line, Mapping):
+            comment = line.comment
+            if comment is not None:
+                comment = comment.text
+            parsed.append((line.source, line.target, comment))
+        elif isinstance(line, Comment):
+            parsed.append(line.text)
+        else:
+            parsed.append(None)
+    return parsed
+
+
+def unpack_lines(parsed):
+    for line in parsed:
+        if line is None:
+            yield EMPTY
+        elif isinstance(line, tuple):
+            source, target, comment = line
+            if comment is not None:
+                comment = Comment(comment)
+            yield Mapping(source, target, comment)
+        else:
+            yield Comment(line)
+
+
+def iter_chunks(lines, chunk_size, jobs=1):
+    ''' Lists of ``chunk_size`` lines.
+
+    If all the lines fit in ``jobs`` chunks, they are split evenly into
+    ``jobs`` chunks instead, so that a short table is parsed in all the
+    processes.
+    '''
+    lines = iter(lines)
+    head = list(islice(lines, chunk_size * jobs))
+    if len(head) < chunk_size * jobs:
+        chunk_size = max((len(head) + jobs - 1) // jobs, 1)
+    for i in range(0, len(head), chunk_size):
+        yield head[i:i + chunk_size]
+    head = None
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_mappings_as_text_table(input_fp, jobs=None, chunk_size=CHUNK_SIZE):
+    ''' Load lines of a text table.
+
+    :param jobs: if more than 1, parse chunks of ``chunk_size`` lines in
+        that many processes. The lines are yielded in the original order.
+        A table shorter than ``jobs`` chunks is split into ``jobs`` smaller
+        chunks, and at most `CHUNKS_PER_JOB` chunks per process are read
+        ahead.
+    '''
+    if jobs is not None and jobs > 1:
+        return load_mappings_in_parallel(input_fp, jobs, chunk_size)
     lineFormat = LineFormat()
     inputFormat = IterableFormat(lineFormat)
     return (
@@ -31,6 +114,26 @@ def load_mappings_as_text_table(input_fp):
     )
 
 
+def load_mappings_in_parallel(input_fp, jobs, chunk_size):
+    pool = Pool(jobs)
+    try:
+        # Pool.imap() 은 입력을 끝까지 미리 읽으므로, 결과를 기다리는
+        # 덩어리 수를 제한한다.
+        pending = deque()
+        for chunk in iter_chunks(input_fp, chunk_size, jobs):
+            pending.append(pool.apply_async(parse_lines, (chunk, )))
+            if len(pending) < jobs * CHUNKS_PER_JOB:
+                continue
+            for line in unpack_lines(pending.popleft().get()):
+                yield line
+        while pending:
+            for line in unpack_lines(pending.popleft().get()):
+                yield line
+    finally:
+        pool.terminate()
+        pool.join()
+
+
 def dump_mappings_as_text_table(mappings, output_fp):
     lineFormat = LineFormat()
     n = 0
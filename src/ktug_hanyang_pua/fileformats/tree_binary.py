@@ -16,15 +16,151 @@
 #   You should have received a copy of the GNU Affero General Public License
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
+''' Tree binary formats.
+
+Version 1 is a sequence of `NodePackFormat` records, from the root.
+
+Version 2 is versioned and wide. All values are little-endian::
+
+    header      magic 'KHTR', version (uint16), reserved (uint16),
+                number of nodes (uint32), number of children (uint32)
+    parents     (int32 x nodes)
+    sources     0 for none (uint32 x nodes)
+    targets     0 for none (uint32 x nodes)
+    offsets     children of node i are children[offsets[i]:offsets[i + 1]]
+                (uint32 x (nodes + 1))
+    children    node indexes, in the order of their sources
+                (uint32 x children)
+
+Every section is 4-byte aligned, so that `load_tree_as_binary()` can use the
+arrays of a `mmap` in place.
+'''
 from __future__ import absolute_import
 from __future__ import print_function
+from array import array
+import struct
+import sys
 
 from ..formats import NodePackFormat
+from .table_binary import as_buffer
+from ..tree import TreeColumns
+from ..tree import build_tree_children_list
+
+
+MAGIC = b'KHTR'
+VERSION = 2
 
+header_struct = struct.Struct('<4sHHII')
 
-def dump_tree_as_binary(tree, output_fp):
+LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def dump_tree_as_binary(tree, output_fp, version=1, node_childrens=None):
+    ''' Dump the tree.
+
+    :param version: 1 or 2.
+    :param node_childrens: children of the nodes, for version 2; built
+        from ``tree`` if omitted.
+    '''
+    if version == VERSION:
+        return dump_tree_as_binary_v2(tree, output_fp, node_childrens)
+    if version != 1:
+        raise ValueError('unsupported version: {}'.format(version))
     nodePackFormat = NodePackFormat()
     for n, node in enumerate(tree, 1):
         node = nodePackFormat.format(node)
         output_fp.write(node)
     return n
+
+
+def dump_tree_as_binary_v2(tree, output_fp, node_childrens=None):
+    ''' Dump the tree in the version 2 format. '''
+    if node_childrens is None:
+        node_childrens = build_tree_children_list(tree)
+    parents = array('i')
+    sources = array('I')
+    targets = array('I')
+    for node in tree:
+        parents.append(node.parent)
+        sources.append(node.source or 0)
+        targets.append(node.target or 0)
+    offsets = array('I', [0])
+    children = array('I')
+    for node_children in node_childrens:
+        children.extend(child for codepoint, child in node_children)
+        offsets.append(len(children))
+
+    header = header_struct.pack(
+        MAGIC, VERSION, 0, len(parents), len(children),
+    )
+    output_fp.write(header)
+    for values in (parents, sources, targets, offsets, children):
+        if not LITTLE_ENDIAN:
+            values.byteswap()
+        output_fp.write(values.tobytes())
+    return len(parents)
+
+
+def load_tree_as_binary(input):
+    ''' Load a `TreeColumns`.
+
+    Both versions are detected: a version 1 file starts with the parent of
+    the root, which is -1.
+
+    :param input: a binary file, or a buffer such as `bytes` or `mmap`.
+        The columns are views of a buffer on little-endian hosts.
+    '''
+    buffer = as_buffer(input)
+    if buffer[:len(MAGIC)].tobytes() == MAGIC:
+        return load_tree_as_binary_v2(buffer)
+
+    nodesize = NodePackFormat().structfmt.size
+    if len(buffer) % nodesize != 0:
+        raise ValueError('truncated binary tree')
+
+    if LITTLE_ENDIAN:
+        parents = buffer.cast('h')[0::3]
+        words = buffer.cast('H')
+    else:
+        parents = array('h', buffer.tobytes())
+        parents.byteswap()
+        parents = parents[0::3]
+        words = array('H', buffer.tobytes())
+        words.byteswap()
+    return TreeColumns(parents, words[1::3], words[2::3])
+
+
+def load_tree_as_binary_v2(buffer):
+    buffer = memoryview(buffer)
+    if len(buffer) < header_struct.size:
+        raise ValueError('truncated binary tree')
+    magic, version, __, n_nodes, n_children = header_struct.unpack_from(
+        buffer
+    )
+    if magic != MAGIC:
+        raise ValueError('not a binary tree: {!r}'.format(magic))
+    if version != VERSION:
+        raise ValueError('unsupported version: {}'.format(version))
+
+    offset = header_struct.size
+    sections = []
+    for typecode, n in (
+        ('i', n_nodes),
+        ('I', n_nodes),
+        ('I', n_nodes),
+        ('I', n_nodes + 1),
+        ('I', n_children),
+    ):
+        section = buffer[offset:offset + n * 4]
+        if len(section) != n * 4:
+            raise ValueError('truncated binary tree')
+        if LITTLE_ENDIAN:
+            section = section.cast(typecode)
+        else:
+            section = array(typecode, section.tobytes())
+            section.byteswap()
+        sections.append(section)
+        offset += n * 4
+
+    parents, sources, targets, offsets, children = sections
+    return TreeColumns(parents, sources, targets, offsets, children)
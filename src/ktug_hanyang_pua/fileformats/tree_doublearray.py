@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+''' Double-array tree binary format.
+
+All values are little-endian::
+
+    header      magic 'KHDA', version (uint16), reserved (uint16),
+                number of codes (uint32), number of slots (uint32)
+    alphabet    codepoint of each code (uint32 x codes)
+    base        (int32 x slots)
+    check       (int32 x slots)
+    targets     (int32 x slots)
+
+Every section is 4-byte aligned, so that `load_tree_as_double_array()` can
+use the arrays of a `mmap` in place.
+'''
+from __future__ import absolute_import
+from __future__ import print_function
+from array import array
+import struct
+import sys
+
+from ..doublearray import DoubleArrayTrie
+from .table_binary import as_buffer
+
+
+MAGIC = b'KHDA'
+VERSION = 1
+
+header_struct = struct.Struct('<4sHHII')
+
+LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def dump_tree_as_double_array(trie, output_fp):
+    header = header_struct.pack(
+        MAGIC, VERSION, 0, len(trie.alphabet), len(trie.base),
+    )
+    output_fp.write(header)
+    for values, typecode in (
+        (trie.alphabet, 'I'),
+        (trie.base, 'i'),
+        (trie.check, 'i'),
+        (trie.targets, 'i'),
+    ):
+        values = array(typecode, values)
+        if not LITTLE_ENDIAN:
+            values.byteswap()
+        output_fp.write(values.tobytes())
+    return len(trie.base)
+
+
+def load_tree_as_double_array(input):
+    ''' Load a `DoubleArrayTrie`.
+
+    :param input: a binary file, or a buffer such as `bytes` or `mmap`.
+        The arrays of a buffer are used in place on little-endian hosts.
+    '''
+    buffer = as_buffer(input)
+
+    magic, version, __, n_codes, n_slots = header_struct.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError('not a double-array tree: {!r}'.format(magic))
+    if version != VERSION:
+        raise ValueError('unsupported version: {}'.format(version))
+
+    offset = header_struct.size
+    sections = []
+    for typecode, n in (
+        ('I', n_codes),
+        ('i', n_slots),
+        ('i', n_slots),
+        ('i', n_slots),
+    ):
+        section = buffer[offset:offset + n * 4]
+        if len(section) != n * 4:
+            raise ValueError('truncated double-array tree')
+        if LITTLE_ENDIAN:
+            section = section.cast(typecode)
+        else:
+            section = array(typecode, section.tobytes())
+            section.byteswap()
+        sections.append(section)
+        offset += n * 4
+
+    alphabet, base, check, targets = sections
+    return DoubleArrayTrie(alphabet, base, check, targets)
@@ -18,13 +18,74 @@
 #
 from __future__ import absolute_import
 from __future__ import print_function
-import json
+from array import array
 
 from ..formats import NodeDictFormat
+from ..tree import TreeColumns
+from .json_array import dump_json_array
+from .json_array import dump_json_columns
+from .json_array import iter_json_array
+from .json_array import load_json_columns
+from .json_array import sniff_json
 
 
-def dump_tree_as_json(tree, output_fp):
+def dump_tree_as_json(tree, output_fp, compact=False, columnar=False):
+    ''' Write the nodes as JSON, one at a time.
+
+    :param compact: without indentation, whitespace and key sorting.
+    :param columnar: in the columnar layout of `dump_tree_as_json_columns()`.
+    :returns: the number of the nodes.
+    '''
+    if columnar:
+        return dump_tree_as_json_columns(tree, output_fp)
     nodeDictFormat = NodeDictFormat()
-    jsonlist = [nodeDictFormat.format(node) for node in tree]
-    json.dump(jsonlist, output_fp, indent=2, sort_keys=True)
-    return len(jsonlist)
+    nodes = (nodeDictFormat.format(node) for node in tree)
+    return dump_json_array(nodes, output_fp, compact=compact)
+
+
+def dump_tree_as_json_columns(tree, output_fp):
+    ''' Write the nodes as JSON in the columnar layout.
+
+    It is an object of parallel arrays: ``parents``, ``sources`` and
+    ``targets``, with 0 for no source or target.
+
+    :returns: the number of the nodes.
+    '''
+    parents = []
+    sources = []
+    targets = []
+    for node in tree:
+        parents.append(node.parent)
+        sources.append(node.source or 0)
+        targets.append(node.target or 0)
+    dump_json_columns({
+        'parents': parents,
+        'sources': sources,
+        'targets': targets,
+    }, output_fp)
+    return len(parents)
+
+
+def load_tree_as_json(input_fp):
+    ''' Load a `TreeColumns`.
+
+    The columnar layout of `dump_tree_as_json_columns()` is detected.
+    '''
+    prefix = sniff_json(input_fp)
+    if prefix.endswith('{'):
+        columns = load_json_columns(
+            prefix + input_fp.read(), ('parents', 'sources', 'targets'),
+        )
+        parents, sources, targets = columns
+        return TreeColumns(
+            array('i', parents), array('I', sources), array('I', targets),
+        )
+
+    parents = array('i')
+    sources = array('I')
+    targets = array('I')
+    for d in iter_json_array(input_fp, prefix=prefix):
+        parents.append(d['parent'])
+        sources.append(d['source'] or 0)
+        targets.append(d['target'] or 0)
+    return TreeColumns(parents, sources, targets)
@@ -19,6 +19,7 @@
 from __future__ import absolute_import
 from __future__ import print_function
 from struct import Struct
+import re
 import sys
 
 from parsec import joint
@@ -68,10 +69,25 @@ class IterableFormat(object):
             yield itemFormat.parse(item)
 
 
+# LineFormat 의 흔한 줄 모양들: 그 밖의 줄은 parsec 문법으로 읽는다.
+CODEPOINTS_PATTERN = r'U\+[0-9A-F]+(?: U\+[0-9A-F]+)*'
+MAPPING_LINE = re.compile(
+    r'({0}) =>(?: ({0}))?(?: %%%(.*))?\n?\Z'.format(CODEPOINTS_PATTERN)
+)
+COMMENT_LINE = re.compile(r'%%%(.*)\n?\Z')
+
+
+def parse_codepoints(codepoints):
+    return tuple(
+        int(codepoint[2:], 16)
+        for codepoint in codepoints.split(' ')
+    )
+
+
 class LineFormat(object):
 
     __slots__ = (
-        'parse',
+        'parse_fallback',
     )
 
     def __init__(self):
@@ -104,13 +120,29 @@ class LineFormat(object):
                 empty,
             )
         )
-        self.parse = line.parse
+        self.parse_fallback = line.parse
 
     def __repr__(self):
         return '{}()'.format(
             type(self).__name__,
         )
 
+    def parse(self, line):
+        match = MAPPING_LINE.match(line)
+        if match is not None:
+            source, target, comment = match.groups()
+            return Mapping(
+                parse_codepoints(source),
+                parse_codepoints(target) if target else (),
+                None if comment is None else Comment(comment),
+            )
+        match = COMMENT_LINE.match(line)
+        if match is not None:
+            return Comment(match.group(1))
+        if not line or line.isspace():
+            return EMPTY
+        return self.parse_fallback(line)
+
     def format(self, line):
         if isinstance(line, Mapping):
             return self.format_mapping(line)
@@ -50,6 +50,7 @@ def split_table(mappings):
 
 
 def make_groups(codes):
+    ''' Split sorted codes into ``[start, end]`` runs. '''
     groups = []
     current_group = None
     for code in codes:
@@ -65,3 +66,19 @@ def make_groups(codes):
         groups.append(current_group)
 
     return groups
+
+
+def fill_holes(items, max_gap=0):
+    ''' Fill the gaps of at most ``max_gap`` codes between sorted
+    ``(code, value)`` items with ``(code, None)`` holes, so that
+    `make_groups()` makes one group over them.
+    '''
+    last_code = None
+    for code, value in items:
+        if last_code is not None and last_code + 1 < code <= (
+            last_code + 1 + max_gap
+        ):
+            for hole in range(last_code + 1, code):
+                yield hole, None
+        yield code, value
+        last_code = code
@@ -18,10 +18,18 @@
 #
 from __future__ import absolute_import
 from __future__ import print_function
+from array import array
+from bisect import bisect_left
+from operator import attrgetter
 
 from .models import Node
 
 
+# 루트의 자식들, 곧 첫소리 자모와 채움 문자가 빽빽이 놓이는 범위:
+# U+1100..U+115F 와 채움 문자 U+1160, 그리고 U+A960..U+A97C
+ROOT_TABLE_RANGES = ((0x1100, 0x1161), (0xA960, 0xA97D))
+
+
 def build_tree(mappings):
     root = Node(
         parent=-1,
@@ -79,3 +87,298 @@ def build_tree_children_list(nodelist):
         for children in node_childrens
     ]
     return tuple(node_childrens)
+
+
+def build_root_tables(root_children, table_ranges=ROOT_TABLE_RANGES):
+    ''' Lay out the children of the root for direct indexing.
+
+    :param root_children: ``(codepoint, child)`` pairs of the root, e.g.
+        ``node_childrens[0]`` of `build_tree()`.
+    :param table_ranges: ``(start, end)`` ranges of the codepoints to index.
+    :returns: a tuple of ``(start, table)`` per range, where
+        ``table[codepoint - start]`` is the child of the root by
+        ``codepoint``, or -1. Children out of the ranges are not in them.
+    '''
+    tables = tuple(
+        (start, array('i', [-1]) * (end - start))
+        for start, end in table_ranges
+    )
+    for codepoint, child in root_children:
+        for start, table in tables:
+            if 0 <= codepoint - start < len(table):
+                table[codepoint - start] = child
+                break
+    return tables
+
+
+class ChildrenIndex(object):
+    ''' Children of the nodes in CSR (compressed sparse row) layout.
+
+    The children of the i-th node are ``nodes[offsets[i]:offsets[i + 1]]``,
+    and their sources are the same slice of ``codepoints``, in order.
+
+    It can be used in place of the node_childrens of `build_tree()`: each
+    item is a tuple of ``(codepoint, child)`` pairs.
+
+    The children of the root are also laid out by `build_root_tables()`,
+    so that the first transition of a walk, which is the most frequent one,
+    is a direct index instead of a search.
+
+    :param root_ranges: ``table_ranges`` of `build_root_tables()`.
+    '''
+
+    __slots__ = (
+        'offsets',
+        'codepoints',
+        'nodes',
+        'root_tables',
+    )
+
+    def __init__(self, offsets, codepoints, nodes,
+                 root_ranges=ROOT_TABLE_RANGES):
+        if len(codepoints) != len(nodes):
+            raise ValueError('codepoints and nodes should be of a length')
+        self.offsets = offsets
+        self.codepoints = codepoints
+        self.nodes = nodes
+        root_children = self[0] if len(offsets) > 1 else ()
+        self.root_tables = build_root_tables(root_children, root_ranges)
+
+    def __repr__(self):
+        return '{}(<{} nodes>, <{} children>)'.format(
+            type(self).__name__,
+            len(self),
+            len(self.nodes),
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, node_index):
+        if node_index < 0:
+            node_index += len(self)
+        start = self.offsets[node_index]
+        end = self.offsets[node_index + 1]
+        return tuple(zip(self.codepoints[start:end], self.nodes[start:end]))
+
+    def __iter__(self):
+        for node_index in range(len(self)):
+            yield self[node_index]
+
+    def child(self, node_index, codepoint):
+        ''' The child of the node by the codepoint, or -1. '''
+        if not node_index:
+            for start, table in self.root_tables:
+                offset = codepoint - start
+                if 0 <= offset < len(table):
+                    return table[offset]
+        start = self.offsets[node_index]
+        end = self.offsets[node_index + 1]
+        i = bisect_left(self.codepoints, codepoint, start, end)
+        if i < end and self.codepoints[i] == codepoint:
+            return self.nodes[i]
+        return -1
+
+
+def build_children_index(tree):
+    ''' Build a `ChildrenIndex` of a tree.
+
+    :param tree: a `TreeColumns`, or the nodelist of `build_tree()`. The
+        CSR children of a `TreeColumns`, e.g. from a version 2 tree binary,
+        are used in one pass.
+    '''
+    if isinstance(tree, TreeColumns) and tree.children_offsets is not None:
+        sources = tree.sources
+        codepoints = array('I', (sources[child] for child in tree.children))
+        return ChildrenIndex(tree.children_offsets, codepoints, tree.children)
+
+    if isinstance(tree, TreeColumns):
+        parents = tree.parents
+        sources = tree.sources
+    else:
+        parents = array('i', (node.parent for node in tree))
+        sources = array('I', (node.source or 0 for node in tree))
+    n_nodes = len(parents)
+
+    # 부모별로 자식 수를 세어 자리를 잡는다. (counting sort)
+    offsets = array('I', [0]) * (n_nodes + 1)
+    for parent in parents:
+        if parent >= 0:
+            offsets[parent + 1] += 1
+    for node_index in range(n_nodes):
+        offsets[node_index + 1] += offsets[node_index]
+    n_children = offsets[n_nodes]
+    codepoints = array('I', [0]) * n_children
+    nodes = array('I', [0]) * n_children
+    positions = array('I', offsets)
+    for node_index, parent in enumerate(parents):
+        if parent < 0:
+            continue
+        position = positions[parent]
+        codepoints[position] = sources[node_index]
+        nodes[position] = node_index
+        positions[parent] = position + 1
+
+    # build_tree() 의 번호는 source 순서가 아니므로 형제끼리 정렬한다.
+    for node_index in range(n_nodes):
+        start = offsets[node_index]
+        end = offsets[node_index + 1]
+        if end - start < 2:
+            continue
+        siblings = sorted(zip(codepoints[start:end], nodes[start:end]))
+        for i, (codepoint, child) in enumerate(siblings, start):
+            codepoints[i] = codepoint
+            nodes[i] = child
+    return ChildrenIndex(offsets, codepoints, nodes)
+
+
+class TreeColumns(object):
+    ''' Tree as three parallel columns, as loaded from a file.
+
+    ``parents[i]``, ``sources[i]`` and ``targets[i]`` are the fields of the
+    i-th node, with 0 for a missing source or target. Each `Node` is made
+    only when it is accessed, and the children of the nodes are indexed on
+    the first access to `node_childrens` or `children_index`.
+
+    The children may be given in CSR layout: those of the i-th node are
+    ``children[children_offsets[i]:children_offsets[i + 1]]``, in the
+    order of their sources.
+
+    It can be used in place of the nodelist of `build_tree()`, e.g.
+    ``Encoder.from_tree(tree, tree.node_childrens)``.
+    '''
+
+    __slots__ = (
+        'parents',
+        'sources',
+        'targets',
+        'children_offsets',
+        'children',
+        '_node_childrens',
+        '_children_index',
+    )
+
+    def __init__(self, parents, sources, targets,
+                 children_offsets=None, children=None):
+        if not len(parents) == len(sources) == len(targets):
+            raise ValueError('columns should have the same length')
+        if children_offsets is not None:
+            if len(children_offsets) != len(parents) + 1:
+                raise ValueError('children_offsets should have n_nodes + 1')
+        self.parents = parents
+        self.sources = sources
+        self.targets = targets
+        self.children_offsets = children_offsets
+        self.children = children
+        self._node_childrens = None
+        self._children_index = None
+
+    def __repr__(self):
+        return '{}(<{} nodes>)'.format(
+            type(self).__name__,
+            len(self),
+        )
+
+    def __len__(self):
+        return len(self.parents)
+
+    def __getitem__(self, node_index):
+        if node_index < 0:
+            node_index += len(self)
+        return Node(
+            parent=self.parents[node_index],
+            source=self.sources[node_index] or None,
+            target=self.targets[node_index] or None,
+        )
+
+    def __iter__(self):
+        for parent, source, target in zip(
+            self.parents, self.sources, self.targets
+        ):
+            yield Node(
+                parent=parent,
+                source=source or None,
+                target=target or None,
+            )
+
+    @property
+    def node_childrens(self):
+        ''' Children of each node, as `build_tree_children_list()` does. '''
+        if self._node_childrens is None:
+            self._node_childrens = tuple(self.children_index)
+        return self._node_childrens
+
+    @property
+    def children_index(self):
+        ''' `ChildrenIndex` of the tree. '''
+        if self._children_index is None:
+            self._children_index = build_children_index(self)
+        return self._children_index
+
+
+class CompactTree(TreeColumns):
+    ''' `TreeColumns` built by `build_compact_tree()`.
+
+    The nodes are numbered breadth-first, and the children of each node in
+    the order of their sources, so the children of a node are consecutive:
+    ``children`` is ``1, 2, ..., n_nodes - 1``.
+    '''
+
+    __slots__ = ()
+
+
+def build_compact_tree(mappings):
+    ''' Build a `CompactTree` of mappings with ``source`` sequences.
+
+    Unlike `build_tree()`, no object is made per node: the mappings are
+    sorted by source, and each level of the tree is laid out in one pass
+    over those long enough.
+    '''
+    mappings = sorted(mappings, key=attrgetter('source'))
+    parents = array('i', [-1])
+    sources = array('I', [0])
+    targets = array('I', [0])
+
+    # 매핑마다 지금까지 읽은 source 앞부분의 노드
+    mapping_nodes = array('i', [0]) * len(mappings)
+    active = []
+    for i, mapping in enumerate(mappings):
+        if mapping.source:
+            active.append(i)
+        else:
+            targets[0] = mapping.target
+
+    depth = 0
+    while active:
+        next_active = []
+        node_index = 0
+        last_parent = -1
+        last_source = None
+        for i in active:
+            mapping = mappings[i]
+            parent = mapping_nodes[i]
+            source = mapping.source[depth]
+            if parent != last_parent or source != last_source:
+                node_index = len(parents)
+                parents.append(parent)
+                sources.append(source)
+                targets.append(0)
+                last_parent = parent
+                last_source = source
+            mapping_nodes[i] = node_index
+            if len(mapping.source) == depth + 1:
+                targets[node_index] = mapping.target
+            else:
+                next_active.append(i)
+        active = next_active
+        depth += 1
+
+    # 너비 우선으로 매겼으므로 부모 번호는 줄지 않는다.
+    n_nodes = len(parents)
+    children_offsets = array('I', [0]) * (n_nodes + 1)
+    for parent in parents[1:]:
+        children_offsets[parent + 1] += 1
+    for node_index in range(n_nodes):
+        children_offsets[node_index + 1] += children_offsets[node_index]
+    children = array('I', range(1, n_nodes))
+    return CompactTree(parents, sources, targets, children_offsets, children)
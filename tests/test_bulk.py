@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+from unittest import TestCase
+from unittest import skipIf
+
+from ktug_hanyang_pua.bulk import numpy
+
+from .fixtures import TABLE
+
+
+class BulkDecoderTestMixin(object):
+
+    use_numpy = None
+
+    def make_one(self, mappings=TABLE.MAPPINGLIST):
+        from ktug_hanyang_pua.bulk import BulkDecoder
+        return BulkDecoder(mappings, use_numpy=self.use_numpy)
+
+    def test_decode(self):
+        decoder = self.make_one()
+        self.assertEqual(
+            u'\u115f\u1161\u11ae',
+            decoder.decode(u'\ue0bc'),
+        )
+        self.assertEqual(
+            u'a\u115f\u11a3\u11ae b\u115f\u1163\u11ab',
+            decoder.decode(u'a\ue0c7 b\uf86a\ue0c8'),
+        )
+        self.assertEqual(u'', decoder.decode(u''))
+        self.assertEqual(u'abc', decoder.decode(u'abc'))
+
+    def test_decode_codepoints(self):
+        from ktug_hanyang_pua.decoder import Decoder
+
+        decoder = self.make_one()
+        text = u'\x00a\ue0bb\ue0bc\ue0c6\uf86a\uf86b\ue0bd\U0010ffff'
+        codepoints = [ord(char) for char in text]
+        expected = Decoder(TABLE.MAPPINGLIST).decode(text)
+        self.assertEqual(
+            [ord(char) for char in expected],
+            list(decoder.decode_codepoints(codepoints)),
+        )
+        self.assertEqual([], list(decoder.decode_codepoints([])))
+
+    def test_empty_table(self):
+        decoder = self.make_one(())
+        self.assertEqual(u'a\ue0bc', decoder.decode(u'a\ue0bc'))
+
+    def test_invalid_source(self):
+        from ktug_hanyang_pua.models import Mapping
+
+        self.assertRaises(
+            ValueError,
+            self.make_one,
+            [Mapping(source=(0xE0BC, 0xE0BD), target=(0x1100,), comment=None)],
+        )
+
+
+class PythonBulkDecoderTest(BulkDecoderTestMixin, TestCase):
+
+    use_numpy = False
+
+    def test_layout(self):
+        decoder = self.make_one()
+        # 그룹 사이의 빈 자리는 -1
+        self.assertEqual(0xE0BC, decoder.start)
+        self.assertEqual(0xF86A - 0xE0BC + 1, len(decoder.lengths))
+        for source, target in decoder.table.items():
+            i = source - decoder.start
+            offset = decoder.offsets[i]
+            self.assertEqual(len(target), decoder.lengths[i])
+            self.assertEqual(
+                target,
+                tuple(decoder.pool[offset:offset + len(target)]),
+            )
+        self.assertEqual(-1, decoder.lengths[0xE0BE - 0xE0BC])
+
+
+@skipIf(numpy is None, 'numpy is not available')
+class NumPyBulkDecoderTest(BulkDecoderTestMixin, TestCase):
+
+    use_numpy = True
+
+    def test_decode_codepoints_returns_uint32(self):
+        decoder = self.make_one()
+        codepoints = numpy.array([0x61, 0xE0BC, 0xF86A], dtype=numpy.uint32)
+        decoded = decoder.decode_codepoints(codepoints)
+        self.assertEqual(numpy.uint32, decoded.dtype)
+        self.assertEqual(
+            [0x61, 0x115F, 0x1161, 0x11AE],
+            decoded.tolist(),
+        )
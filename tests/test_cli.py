@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+from io import StringIO
+from unittest import TestCase
+import io
+import os.path
+import shutil
+import sys
+import tempfile
+
+from .fixtures import TABLE
+
+
+PUA_TEXT = u'a\ue0bc\ue0bd \ue0c6\ue0c7\ue0c8\n'
+JAMO_TEXT = (
+    u'a\u115f\u1161\u11ae\u115f\u1161\ud7cd '
+    u'\u115f\u11a3\u115f\u11a3\u11ae\u115f\u1163\u11ab\n'
+)
+
+
+class ConvertStreamTest(TestCase):
+
+    def test_decode_stream(self):
+        from ktug_hanyang_pua.cli import decode_stream
+        from ktug_hanyang_pua.decoder import Decoder
+
+        decoder = Decoder(TABLE.MAPPINGLIST)
+        for buffer_size in (1, 2, 3, 1024):
+            output_fp = StringIO()
+            n = decode_stream(
+                decoder, StringIO(PUA_TEXT), output_fp, buffer_size,
+            )
+            self.assertEqual(JAMO_TEXT, output_fp.getvalue())
+            self.assertEqual(len(JAMO_TEXT), n)
+
+    def test_encode_stream(self):
+        from ktug_hanyang_pua.cli import encode_stream
+        from ktug_hanyang_pua.encoder import Encoder
+
+        encoder = Encoder.from_mappings(TABLE.MAPPINGLIST)
+        for buffer_size in (1, 2, 3, 1024):
+            output_fp = StringIO()
+            n = encode_stream(
+                encoder, StringIO(JAMO_TEXT), output_fp, buffer_size,
+            )
+            self.assertEqual(PUA_TEXT, output_fp.getvalue())
+            self.assertEqual(len(PUA_TEXT), n)
+
+
+class ConvertMainTest(TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.table = self.write('table.txt', u'\n'.join(TABLE.MAPPINGS))
+        self.output = os.path.join(self.tempdir, 'output.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def write(self, name, text):
+        filename = os.path.join(self.tempdir, name)
+        with io.open(filename, 'w', encoding='utf-8', newline='') as fp:
+            fp.write(text)
+        return filename
+
+    def read_output(self):
+        with io.open(self.output, 'r', encoding='utf-8', newline='') as fp:
+            return fp.read()
+
+    def test_decode(self):
+        from ktug_hanyang_pua.cli import convert_main
+
+        input = self.write('pua.txt', PUA_TEXT)
+        convert_main(['-t', self.table, '-o', self.output, input])
+        self.assertEqual(JAMO_TEXT, self.read_output())
+
+    def test_encode(self):
+        from ktug_hanyang_pua.cli import convert_main
+
+        # 끝의 자모열도 쓴다.
+        input = self.write('jamo.txt', JAMO_TEXT.rstrip(u'\n'))
+        convert_main([
+            '-t', self.table, '-e', '--buffer-size', '3', '-o', self.output,
+            input,
+        ])
+        self.assertEqual(PUA_TEXT.rstrip(u'\n'), self.read_output())
+
+    def test_cache_dir(self):
+        from ktug_hanyang_pua.cache import dump_tables
+        from ktug_hanyang_pua.cli import convert_main
+        from ktug_hanyang_pua.decoder import Decoder
+        from ktug_hanyang_pua.encoder import Encoder
+        from ktug_hanyang_pua.models import Mapping
+
+        cache_dir = os.path.join(self.tempdir, 'cache')
+        input = self.write('pua.txt', PUA_TEXT)
+        argv = ['-t', self.table, '--cache-dir', cache_dir, '-o', self.output]
+        convert_main(argv + [input])
+        self.assertEqual(JAMO_TEXT, self.read_output())
+        entries = os.listdir(cache_dir)
+        self.assertEqual(1, len(entries))
+
+        # 두 번째에는 표를 다시 읽지 않고 캐시를 쓴다.
+        mappings = [
+            Mapping(source=(0xE0BC, ), target=(0x41, ), comment=None),
+        ]
+        with io.open(os.path.join(cache_dir, entries[0]), 'wb') as fp:
+            dump_tables(
+                Decoder(mappings), Encoder.from_mappings(mappings), fp,
+            )
+        input = self.write('pua.txt', u'\ue0bc\ue0bd')
+        convert_main(argv + [input])
+        self.assertEqual(u'A\ue0bd', self.read_output())
+        convert_main(argv + ['-e', self.write('jamo.txt', u'A')])
+        self.assertEqual(u'\ue0bc', self.read_output())
+
+    def test_main(self):
+        from ktug_hanyang_pua.cli import main
+
+        input = self.write('pua.txt', PUA_TEXT)
+        argv = sys.argv
+        sys.argv = [
+            'ktug-hanyang-pua', '-v', 'convert', '-t', self.table,
+            '-o', self.output, input,
+        ]
+        try:
+            main()
+        finally:
+            sys.argv = argv
+        self.assertEqual(JAMO_TEXT, self.read_output())
+
+    def test_max_gap(self):
+        from ktug_hanyang_pua.cli import main
+
+        argv = sys.argv
+        stderr = sys.stderr
+        try:
+            # 버전 1 에는 빈 자리를 둘 수 없다.
+            sys.argv = [
+                'ktug-hanyang-pua', '-F', 'binary', '--max-gap', '8',
+                '-o', self.output, self.table,
+            ]
+            sys.stderr = io.StringIO()
+            self.assertRaises(SystemExit, main)
+            self.assertFalse(os.path.exists(self.output))
+
+            sys.argv[1:1] = ['--table-binary-version', '2']
+            main()
+        finally:
+            sys.argv = argv
+            sys.stderr = stderr
+        with io.open(self.output, 'rb') as fp:
+            self.assertEqual(b'KHTB', fp.read(4))
+
+    def test_split_command(self):
+        from ktug_hanyang_pua.cli import split_command
+
+        self.assertEqual(
+            ('convert', ['-t', 'table.txt']),
+            split_command(['convert', '-t', 'table.txt']),
+        )
+        self.assertEqual(
+            ('convert', ['-vv', '--verbose', '-e']),
+            split_command(['-vv', '--verbose', 'convert', '-e']),
+        )
+        # 명령 앞에 다른 선택지가 있으면 파일 이름이다.
+        self.assertEqual(
+            (None, ['-F', 'json', 'convert']),
+            split_command(['-F', 'json', 'convert']),
+        )
+        self.assertEqual(
+            (None, ['./convert']),
+            split_command(['./convert']),
+        )
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+from io import BytesIO
+from unittest import TestCase
+import codecs
+import io
+import itertools
+import os.path
+import shutil
+import tempfile
+
+from .fixtures import TABLE
+
+
+PUA_TEXT = u'a\ue0bc\ue0bd \ue0c6\ue0c7\ue0c8\n'
+JAMO_TEXT = (
+    u'a\u115f\u1161\u11ae\u115f\u1161\ud7cd '
+    u'\u115f\u11a3\u115f\u11a3\u11ae\u115f\u1163\u11ab\n'
+)
+PUA_BYTES = PUA_TEXT.encode('utf-8')
+
+_counter = itertools.count()
+
+
+class CodecTest(TestCase):
+
+    maxDiff = None
+
+    def setUp(self):
+        from ktug_hanyang_pua.codec import register
+
+        self.tempdir = tempfile.mkdtemp()
+        self.table = os.path.join(self.tempdir, 'table.txt')
+        with io.open(self.table, 'w', encoding='utf-8') as fp:
+            fp.write(u'\n'.join(TABLE.MAPPINGS))
+
+        # 한 번 찾은 코덱은 codecs 가 캐시하므로 매번 새 이름을 쓴다.
+        self.name = 'hanyang-pua-test-{}'.format(next(_counter))
+        self.search = register(self.table, name=self.name)
+
+    def tearDown(self):
+        if hasattr(codecs, 'unregister'):
+            codecs.unregister(self.search)
+        shutil.rmtree(self.tempdir)
+
+    def test_lookup(self):
+        codecInfo = codecs.lookup(self.name)
+        self.assertEqual(self.name, codecInfo.name)
+        self.assertEqual(
+            codecInfo.name,
+            codecs.lookup(self.name.upper().replace('-', '_')).name,
+        )
+
+    def test_lookup_is_lazy(self):
+        from ktug_hanyang_pua.codec import get_tables
+
+        tables = get_tables(self.table)
+        self.assertEqual(None, tables._decoder)
+        self.assertEqual(None, tables._encoder)
+        codecs.decode(PUA_BYTES, self.name)
+        self.assertTrue(get_tables(self.table) is tables)
+        self.assertNotEqual(None, tables._decoder)
+
+    def test_encode_and_decode(self):
+        self.assertEqual(JAMO_TEXT, codecs.decode(PUA_BYTES, self.name))
+        self.assertEqual(PUA_BYTES, codecs.encode(JAMO_TEXT, self.name))
+        self.assertEqual(JAMO_TEXT, PUA_BYTES.decode(self.name))
+        self.assertEqual(PUA_BYTES, JAMO_TEXT.encode(self.name))
+
+    def test_iterencode(self):
+        encoded = codecs.iterencode(iter(JAMO_TEXT), self.name)
+        self.assertEqual(PUA_BYTES, b''.join(encoded))
+
+    def test_iterdecode(self):
+        chunks = (PUA_BYTES[i:i + 1] for i in range(len(PUA_BYTES)))
+        decoded = codecs.iterdecode(chunks, self.name)
+        self.assertEqual(JAMO_TEXT, u''.join(decoded))
+
+    def test_textio(self):
+        input_fp = io.TextIOWrapper(BytesIO(PUA_BYTES), encoding=self.name)
+        self.assertEqual(JAMO_TEXT, input_fp.read())
+
+        output_fp = io.TextIOWrapper(BytesIO(), encoding=self.name)
+        for char in JAMO_TEXT:
+            output_fp.write(char)
+        output_fp.flush()
+        self.assertEqual(PUA_BYTES, output_fp.buffer.getvalue())
+
+    def test_stream_reader(self):
+        streamReader = codecs.getreader(self.name)(BytesIO(PUA_BYTES))
+        decoded = []
+        while True:
+            text = streamReader.read(1)
+            if not text:
+                break
+            decoded.append(text)
+        self.assertEqual(JAMO_TEXT, u''.join(decoded))
+
+    def test_stream_writer(self):
+        output_fp = BytesIO()
+        streamWriter = codecs.getwriter(self.name)(output_fp)
+        text = JAMO_TEXT.rstrip(u'\n')
+        for char in text:
+            streamWriter.write(char)
+        streamWriter.reset()
+        self.assertEqual(
+            PUA_TEXT.rstrip(u'\n').encode('utf-8'),
+            output_fp.getvalue(),
+        )
+
+    def test_cache(self):
+        from ktug_hanyang_pua.cache import read_cache
+        from ktug_hanyang_pua.codec import Tables
+
+        cache_dir = os.path.join(self.tempdir, 'cache')
+        tables = Tables(self.table, cache_dir=cache_dir)
+        self.assertEqual(JAMO_TEXT, tables.decoder.decode(PUA_TEXT))
+        entries = os.listdir(cache_dir)
+        self.assertEqual(1, len(entries))
+        self.assertTrue(entries[0].endswith('.marshal'))
+        entry = os.path.join(cache_dir, entries[0])
+
+        decoder, encoder = read_cache(entry)
+        self.assertEqual(tables.decoder.table, decoder.table)
+        self.assertEqual(tables.encoder.targets, encoder.targets)
+        self.assertEqual(tables.encoder.transitions, encoder.transitions)
+
+        tables = Tables(self.table, cache_dir=cache_dir)
+        self.assertEqual(JAMO_TEXT, tables.decoder.decode(PUA_TEXT))
+        self.assertEqual(PUA_TEXT, tables.encoder.encode(JAMO_TEXT))
+
+        # 깨진 항목은 다시 만든다.
+        with io.open(entry, 'wb') as fp:
+            fp.write(b'\x00')
+        self.assertRaises(ValueError, read_cache, entry)
+        tables = Tables(self.table, cache_dir=cache_dir)
+        self.assertEqual(JAMO_TEXT, tables.decoder.decode(PUA_TEXT))
+        self.assertEqual(decoder.table, read_cache(entry)[0].table)
+
+        # 표가 바뀌면 새 항목을 쓴다.
+        with io.open(self.table, 'w', encoding='utf-8') as fp:
+            fp.write(u'\n'.join(TABLE.MAPPINGS[:1]))
+        tables = Tables(self.table, cache_dir=cache_dir)
+        self.assertEqual(1, len(tables.decoder.table))
+        self.assertEqual(2, len(os.listdir(cache_dir)))
+
+    def test_register_with_cache(self):
+        from ktug_hanyang_pua.codec import register
+
+        cache_dir = os.path.join(self.tempdir, 'cache')
+        name = self.name + '-cached'
+        search = register(self.table, name=name, cache_dir=cache_dir)
+        try:
+            self.assertEqual(JAMO_TEXT, codecs.decode(PUA_BYTES, name))
+            self.assertEqual(PUA_BYTES, codecs.encode(JAMO_TEXT, name))
+        finally:
+            if hasattr(codecs, 'unregister'):
+                codecs.unregister(search)
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+
+    def test_open(self):
+        from ktug_hanyang_pua.codec import open as codec_open
+
+        # 끝의 자모열은 닫을 때 쓴다.
+        filename = os.path.join(self.tempdir, 'output.txt')
+        fp = codec_open(filename, 'w', encoding=self.name)
+        fp.write(u'\u115f\u11a3')
+        fp.close()
+        fp.close()
+        with io.open(filename, 'rb') as fp:
+            self.assertEqual(u'\ue0c6'.encode('utf-8'), fp.read())
+
+        with codec_open(filename, 'w', encoding=self.name) as fp:
+            fp.write(JAMO_TEXT.rstrip(u'\n'))
+        with io.open(filename, 'rb') as fp:
+            self.assertEqual(PUA_TEXT.rstrip(u'\n').encode('utf-8'), fp.read())
+
+        with codec_open(filename, encoding=self.name) as fp:
+            self.assertEqual(JAMO_TEXT.rstrip(u'\n'), fp.read())
+
+    def test_stream_writer_close(self):
+        output_fp = BytesIO()
+        output_fp.close = lambda: None
+        with codecs.getwriter(self.name)(output_fp) as streamWriter:
+            streamWriter.write(u'\u115f\u11a3')
+        self.assertEqual(u'\ue0c6'.encode('utf-8'), output_fp.getvalue())
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+from unittest import TestCase
+
+from .fixtures import TABLE
+
+
+class DecoderTest(TestCase):
+
+    maxDiff = None
+
+    def make_one(self):
+        from ktug_hanyang_pua.decoder import Decoder
+        return Decoder(TABLE.MAPPINGLIST)
+
+    def test_decode(self):
+        decoder = self.make_one()
+        self.assertEqual(
+            u'\u115f\u1161\u11ae',
+            decoder.decode(u'\ue0bc'),
+        )
+        self.assertEqual(
+            u'a\u115f\u11a3\u11ae b\u115f\u1163\u11ab',
+            decoder.decode(u'a\ue0c7 b\uf86a\ue0c8'),
+        )
+        self.assertEqual(u'', decoder.decode(u''))
+        self.assertEqual(u'abc', decoder.decode(u'abc'))
+
+    def test_decode_many(self):
+        decoder = self.make_one()
+        self.assertEqual(
+            [u'\u115f\u1161\ud7cd', u'', u'x\u115f\u11a3'],
+            list(decoder.decode_many([u'\ue0bd', u'\uf86a', u'x\ue0c6'])),
+        )
+
+    def test_ignore_non_mappings(self):
+        from ktug_hanyang_pua.decoder import Decoder
+        from ktug_hanyang_pua.models import Comment
+        from ktug_hanyang_pua.models import EMPTY
+
+        decoder = Decoder(
+            (EMPTY, Comment(' comment')) + TABLE.MAPPINGLIST
+        )
+        self.assertEqual(
+            u'\u115f\u11a3',
+            decoder.decode(u'\ue0c6'),
+        )
+
+    def test_multiple_source_codepoints(self):
+        from ktug_hanyang_pua.decoder import Decoder
+
+        self.assertRaises(
+            ValueError,
+            Decoder,
+            TABLE.MAPPINGLIST_SWITCHED,
+        )
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+from unittest import TestCase
+
+from .fixtures import TREE
+
+
+class CompileDFATest(TestCase):
+
+    maxDiff = None
+
+    def test_compile_dfa(self):
+        from ktug_hanyang_pua.dfa import compile_dfa
+
+        dfa = compile_dfa(TREE.NODELIST, TREE.NODE_CHILDRENS)
+
+        # 0x115F 0x1161 0x1163 0x11A3 0x11AB 0x11AE 0xD7CD
+        self.assertEqual(8, dfa.n_classes)
+        self.assertEqual(7, dfa.input_class(0xD7CD))
+        self.assertEqual(0, dfa.input_class(0x41))
+        self.assertEqual(0, dfa.input_class(0x11FF))
+        self.assertEqual(0, dfa.input_class(0xD800))
+        self.assertEqual(0, dfa.input_class(0x10FFFF))
+        # 자모가 있는 쪽만 따로 두고, 나머지는 0 으로 된 한 쪽을 같이 쓴다.
+        self.assertEqual(0xD8, len(dfa.pages))
+        self.assertEqual(3, len(set(id(page) for page in dfa.pages)))
+        for state, children in enumerate(TREE.NODE_CHILDRENS):
+            children = dict(children)
+            for codepoint in (0x41, 0x115F, 0x1161, 0x1163, 0x11A3, 0x11AB,
+                              0x11AE, 0xD7CD, 0x10FFFF):
+                self.assertEqual(
+                    children.get(codepoint, -1),
+                    dfa.transition(state, codepoint),
+                )
+        self.assertEqual(
+            [0xF86A, -1, -1, 0xE0BC, 0xE0BD, 0xE0C6, 0xE0C7, -1, 0xE0C8],
+            list(dfa.accepts),
+        )
+        # 자식의 부류가 있는 범위만 줄에 둔다.
+        self.assertEqual(
+            [0, 0, 0, 1, 1, 0, 1, 0, 1],
+            [0 if high else 1 for high in dfa.highs],
+        )
+        self.assertEqual(
+            sum(high - low for low, high in zip(dfa.lows, dfa.highs)),
+            len(dfa.transitions),
+        )
+        self.assertTrue(len(dfa.transitions) < len(TREE.NODELIST) * 8)
+
+
+class DFAEncoderTest(TestCase):
+
+    maxDiff = None
+
+    def test_same_as_encoder(self):
+        from ktug_hanyang_pua.dfa import DFAEncoder
+        from ktug_hanyang_pua.encoder import Encoder
+        from ktug_hanyang_pua.encoder import IncrementalEncoder
+
+        encoder = Encoder(TREE.NODELIST, TREE.NODE_CHILDRENS)
+        dfaEncoder = DFAEncoder(TREE.NODELIST, TREE.NODE_CHILDRENS)
+        codepoints = [
+            0x41, 0x115F, 0x1161, 0x11AE,
+            0x115F, 0x1161, 0x115F, 0x1163, 0x11AB,
+            0x115F, 0x11A3, 0x11AE, 0x115F, 0x11A3,
+            0x115F, 0x1161,
+        ]
+        expected = list(encoder.encode_codepoints(codepoints))
+        self.assertEqual(
+            expected,
+            list(dfaEncoder.encode_codepoints(codepoints)),
+        )
+        for i in range(len(codepoints) + 1):
+            incrementalEncoder = IncrementalEncoder(dfaEncoder)
+            encoded = incrementalEncoder.feed(codepoints[:i])
+            encoded += incrementalEncoder.feed(codepoints[i:])
+            encoded += incrementalEncoder.flush()
+            self.assertEqual(expected, encoded, i)
+
+    def test_codepoints_out_of_jamo(self):
+        from ktug_hanyang_pua.dfa import DFAEncoder
+        from ktug_hanyang_pua.models import Mapping
+
+        # 자모 밖의 코드포인트도 제 쪽에 부류가 있다.
+        encoder = DFAEncoder.from_mappings([
+            Mapping(source=(0xE000, ), target=(0x41, 0x42), comment=None),
+            Mapping(source=(0xE001, ), target=(0x10000, ), comment=None),
+            Mapping(source=(0xE002, ), target=(0x1100, ), comment=None),
+        ])
+        self.assertEqual(
+            u'\ue000A\ue001\U00010001\ue002\U0010ffff',
+            encoder.encode(u'ABA\U00010000\U00010001\u1100\U0010ffff'),
+        )
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+from unittest import TestCase
+
+from .fixtures import TABLE
+from .fixtures import TREE
+
+
+class DoubleArrayTest(TestCase):
+
+    maxDiff = None
+
+    def make_one(self):
+        from ktug_hanyang_pua.doublearray import build_double_array
+        return build_double_array(TREE.NODELIST, TREE.NODE_CHILDRENS)
+
+    def test_lookup(self):
+        trie = self.make_one()
+        for mapping in TABLE.MAPPINGLIST_SWITCHED:
+            self.assertEqual(
+                mapping.target[0],
+                trie.lookup(mapping.source),
+            )
+        self.assertEqual(None, trie.lookup((0x115F,)))
+        self.assertEqual(None, trie.lookup((0x115F, 0x1161)))
+        self.assertEqual(None, trie.lookup((0x1161,)))
+        self.assertEqual(None, trie.lookup((0x115F, 0x11AE)))
+        self.assertEqual(None, trie.lookup((0x41,)))
+
+    def test_structure(self):
+        trie = self.make_one()
+
+        # 각 칸은 부모에서 base + code 로 이어진다.
+        def walk(slot, node_index):
+            for codepoint, child in TREE.NODE_CHILDRENS[node_index]:
+                child_slot = trie.transition(slot, codepoint)
+                self.assertEqual(slot, trie.check[child_slot])
+                self.assertEqual(
+                    TREE.NODELIST[child].target or -1,
+                    trie.targets[child_slot],
+                )
+                self.assertEqual(
+                    not TREE.NODE_CHILDRENS[child],
+                    trie.base[child_slot] == 0,
+                )
+                walk(child_slot, child)
+        walk(0, 0)
+
+        n_used = sum(1 for check in trie.check if check >= 0)
+        self.assertEqual(len(TREE.NODELIST) - 1, n_used)
+
+
+class DoubleArrayEncoderTest(TestCase):
+
+    maxDiff = None
+
+    def test_same_as_encoder(self):
+        from ktug_hanyang_pua.doublearray import DoubleArrayEncoder
+        from ktug_hanyang_pua.encoder import Encoder
+
+        encoder = Encoder(TREE.NODELIST, TREE.NODE_CHILDRENS)
+        daEncoder = DoubleArrayEncoder.from_tree(
+            TREE.NODELIST, TREE.NODE_CHILDRENS
+        )
+        codepoints = [
+            0x41, 0x115F, 0x1161, 0x11AE,
+            0x115F, 0x1161, 0x115F, 0x1163, 0x11AB,
+            0x115F, 0x11A3, 0x11AE, 0x115F, 0x11A3,
+            0x115F, 0x1161,
+        ]
+        self.assertEqual(
+            list(encoder.encode_codepoints(codepoints)),
+            list(daEncoder.encode_codepoints(codepoints)),
+        )
+
+    def test_from_mappings(self):
+        from ktug_hanyang_pua.doublearray import DoubleArrayEncoder
+
+        encoder = DoubleArrayEncoder.from_mappings(TABLE.MAPPINGLIST)
+        self.assertEqual(
+            u'a\ue0bc\ue0c6',
+            encoder.encode(u'a\u115f\u1161\u11ae\u115f\u11a3'),
+        )
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+#
+#   ktug-hanyang-pua: KTUG Hanyang PUA table reader/writer
+#   Copyright (C) 2015-2019 mete0r <mete0r@sarangbang.or.kr>
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU Affero General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU Affero General Public License for more details.
+#
+#   You should have received a copy of the GNU Affero General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import
+from __future__ import print_function
+from unittest import TestCase
+
+from .fixtures import TABLE
+from .fixtures import TREE
+
+
+class EncoderTest(TestCase):
+
+    maxDiff = None
+
+    def make_one(self):
+        from ktug_hanyang_pua.encoder import Encoder
+        return Encoder(TREE.NODELIST, TREE.NODE_CHILDRENS)
+
+    def test_encode(self):
+        encoder = self.make_one()
+        self.assertEqual(u'', encoder.encode(u''))
+        self.assertEqual(u'abc', encoder.encode(u'abc'))
+        self.assertEqual(
+            u'\ue0bc',
+            encoder.encode(u'\u115f\u1161\u11ae'),
+        )
+        self.assertEqual(
+            u'a\ue0c7 \ue0c8b',
+            encoder.encode(u'a\u115f\u11a3\u11ae \u115f\u1163\u11abb'),
+        )
+
+    def test_encode_longest_match(self):
+        encoder = self.make_one()
+        self.assertEqual(
+            u'\ue0c6',
+            encoder.encode(u'\u115f\u11a3'),
+        )
+        self.assertEqual(
+            u'\ue0c6x',
+            encoder.encode(u'\u115f\u11a3x'),
+        )
+        self.assertEqual(
+            u'\ue0c7\ue0c6',
+            encoder.encode(u'\u115f\u11a3\u11ae\u115f\u11a3'),
+        )
+
+    def test_encode_unmatched_prefix(self):
+        encoder = self.make_one()
+        self.assertEqual(
+            u'\u115f\u1161',
+            encoder.encode(u'\u115f\u1161'),
+        )
+        self.assertEqual(
+            u'\u115f\u1161\ue0c8',
+            encoder.encode(u'\u115f\u1161\u115f\u1163\u11ab'),
+        )
+        self.assertEqual(
+            u'\u115f\u1163\u115f',
+            encoder.encode(u'\u115f\u1163\u115f'),
+        )
+
+    def test_encode_root_children(self):
+        from ktug_hanyang_pua.encoder import Encoder
+        from ktug_hanyang_pua.models import Mapping
+
+        # 첫소리 범위 두 곳과, 그 밖의 루트의 자식
+        encoder = Encoder.from_mappings([
+            Mapping(source=(0xE000, ), target=(0x1160, ), comment=None),
+            Mapping(source=(0xE001, ), target=(0xA960, 0x1161),
+                    comment=None),
+            Mapping(source=(0xE002, ), target=(0x41, 0x42), comment=None),
+        ])
+        self.assertEqual(
+            u'\ue000\ue001\ue002a\ua960A',
+            encoder.encode(u'\u1160\ua960\u1161AB' u'a\ua960A'),
+        )
+
+    def test_encode_codepoints(self):
+        encoder = self.make_one()
+        codepoints = iter([0x41, 0x115F, 0x1161, 0xD7CD, 0x115F])
+        self.assertEqual(
+            [0x41, 0xE0BD, 0x115F],
+            list(encoder.encode_codepoints(codepoints)),
+        )
+
+    def test_roundtrip(self):
+        from ktug_hanyang_pua.decoder import Decoder
+
+        decoder = Decoder(TABLE.MAPPINGLIST)
+        encoder = self.make_one()
+        text = u'\ue0bc\ue0bd \ue0c6\ue0c7\ue0c8'
+        self.assertEqual(
+            text,
+            encoder.encode(decoder.decode(text)),
+        )
+
+
+class IncrementalEncoderTest(TestCase):
+
+    maxDiff = None
+
+    def make_one(self):
+        from ktug_hanyang_pua.encoder import Encoder
+        from ktug_hanyang_pua.encoder import IncrementalEncoder
+        encoder = Encoder(TREE.NODELIST, TREE.NODE_CHILDRENS)
+        return IncrementalEncoder(encoder)
+
+    def test_feed_and_flush(self):
+        incrementalEncoder = self.make_one()
+        self.assertEqual([], incrementalEncoder.feed([0x115F]))
+        self.assertEqual([], incrementalEncoder.feed([0x1161]))
+        self.assertEqual([0xE0BC], incrementalEncoder.feed([0x11AE]))
+        self.assertEqual([], incrementalEncoder.feed([0x115F, 0x11A3]))
+        self.assertEqual([0xE0C6, 0x41], incrementalEncoder.feed([0x41]))
+        self.assertEqual([], incrementalEncoder.feed([0x115F, 0x11A3]))
+        self.assertEqual([0xE0C6], incrementalEncoder.flush())
+        self.assertEqual([], incrementalEncoder.flush())
+
+    def test_flush_unmatched(self):
+        incrementalEncoder = self.make_one()
+        self.assertEqual([], incrementalEncoder.feed([0x115F, 0x1161]))
+        self.assertEqual([0x115F, 0x1161], incrementalEncoder.flush())
+
+    def test_reset(self):
+        incrementalEncoder = self.make_one()
+        incrementalEncoder.feed([0x115F, 0x1161])
+        incrementalEncoder.reset()
+        self.assertEqual([0x11AE], incrementalEncoder.feed([0x11AE]))
+
+    def test_same_as_oneshot(self):
+        from ktug_hanyang_pua.encoder import Encoder
+
+        encoder = Encoder(TREE.NODELIST, TREE.NODE_CHILDRENS)
+        codepoints = [
+            0x115F, 0x1161, 0x11AE,
+            0x115F, 0x1161, 0x115F, 0x1163, 0x11AB,
+            0x115F, 0x11A3, 0x11AE, 0x115F, 0x11A3,
+            0x115F, 0x1161,
+        ]
+        expected = list(encoder.encode_codepoints(codepoints))
+        for i in range(len(codepoints) + 1):
+            for j in range(i, len(codepoints) + 1):
+                incrementalEncoder = self.make_one()
+                encoded = incrementalEncoder.feed(codepoints[:i])
+                encoded += incrementalEncoder.feed(codepoints[i:j])
+                encoded += incrementalEncoder.feed(codepoints[j:])
+                encoded += incrementalEncoder.flush()
+                self.assertEqual(expected, encoded, (i, j))
@@ -22,7 +22,9 @@ from io import BytesIO
 from io import StringIO
 from unittest import TestCase
 import json
+import mmap
 import sys
+import tempfile
 
 from .fixtures import TABLE
 from .fixtures import TREE
@@ -32,6 +34,16 @@ PY3 = sys.version_info.major == 3
 if PY3:
     unicode = str
 
+LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def map_bytes(data):
+    ''' A read-only `mmap` of a temporary file of the data. '''
+    with tempfile.TemporaryFile() as fp:
+        fp.write(data)
+        fp.flush()
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
 
 class TextTableFileFormatTest(TestCase):
 
@@ -51,6 +63,64 @@ class TextTableFileFormatTest(TestCase):
             tuple(mappings),
         )
 
+    def test_load_jobs(self):
+        from ktug_hanyang_pua.fileformats.table_text import dump_mappings_as_text_table  # noqa
+        from ktug_hanyang_pua.fileformats.table_text import load_mappings_as_text_table  # noqa
+        if PY3:
+            ioclass = StringIO
+        else:
+            ioclass = BytesIO
+        text = '\n'.join(
+            ('%%% header', '') + TABLE.MAPPINGS + ('', '%%% footer', '')
+        )
+        expected = list(load_mappings_as_text_table(ioclass(text)))
+        mappings = load_mappings_as_text_table(
+            ioclass(text), jobs=2, chunk_size=2,
+        )
+        mappings = list(mappings)
+        self.assertEqual(expected, mappings)
+
+        output_fp = ioclass()
+        dump_mappings_as_text_table(mappings, output_fp)
+        self.assertEqual(text, output_fp.getvalue())
+
+        # 결과를 기다리는 덩어리는 작업 프로세스마다 둘까지만 읽는다.
+        lines = TABLE.MAPPINGS * 20
+        read = []
+
+        def readlines():
+            for line in lines:
+                read.append(line)
+                yield line
+        mappings = load_mappings_as_text_table(
+            readlines(), jobs=2, chunk_size=2,
+        )
+        self.assertEqual(TABLE.MAPPINGLIST[0], next(mappings))
+        self.assertEqual(2 * 2 * 2, len(read))
+        self.assertEqual(
+            list(TABLE.MAPPINGLIST * 20)[1:],
+            list(mappings),
+        )
+
+    def test_iter_chunks(self):
+        from ktug_hanyang_pua.fileformats.table_text import iter_chunks
+
+        def sizes(n, chunk_size, jobs):
+            chunks = iter_chunks(range(n), chunk_size, jobs)
+            return [len(chunk) for chunk in chunks]
+
+        self.assertEqual([10, 10, 5], sizes(25, 10, 1))
+        self.assertEqual([10, 10, 10, 10, 5], sizes(45, 10, 4))
+        # 짧은 표도 모든 작업 프로세스에 나눈다.
+        self.assertEqual([3, 3, 3, 3], sizes(12, 10, 4))
+        self.assertEqual([2, 2, 1], sizes(5, 10, 3))
+        self.assertEqual([1, 1], sizes(2, 10, 4))
+        self.assertEqual([], sizes(0, 10, 4))
+        self.assertEqual(
+            [[0, 1], [2, 3], [4]],
+            list(iter_chunks(range(5), 10, 3)),
+        )
+
     def test_dump(self):
         from ktug_hanyang_pua.fileformats.table_text import dump_mappings_as_text_table  # noqa
         if PY3:
@@ -75,6 +145,31 @@ class TextTableFileFormatTest(TestCase):
         )
 
 
+class JsonArrayTest(TestCase):
+
+    def test_iter_json_array(self):
+        from ktug_hanyang_pua.fileformats.json_array import iter_json_array
+
+        if PY3:
+            ioclass = StringIO
+        else:
+            ioclass = BytesIO
+        values = [1, -2.5e10, u'\u1100', [], {'a': [None, True]}, 12345]
+        for indent in (None, 2):
+            text = json.dumps(values, indent=indent)
+            for chunk_size in (1, 3, 1024):
+                self.assertEqual(
+                    values,
+                    list(iter_json_array(ioclass(text), chunk_size)),
+                )
+        self.assertEqual([], list(iter_json_array(ioclass(' [ ] '))))
+
+        for text in ('', '{}', '[1', '[1,', '[1 2]', '[1,]'):
+            self.assertRaises(
+                ValueError, list, iter_json_array(ioclass(text), 2),
+            )
+
+
 class JsonTableFileFormatTest(TestCase):
 
     maxDiff = None
@@ -115,6 +210,66 @@ class JsonTableFileFormatTest(TestCase):
             tuple(mappings),
         )
 
+    def test_dump_compact(self):
+        from ktug_hanyang_pua.fileformats.table_json import dump_mappings_as_json_table  # noqa
+
+        if PY3:
+            ioclass = StringIO
+        else:
+            ioclass = BytesIO
+        output_fp = ioclass()
+        n = dump_mappings_as_json_table(
+            iter(TABLE.MAPPINGLIST), output_fp, compact=True,
+        )
+        self.assertEqual(len(TABLE.MAPPINGLIST), n)
+        self.assertFalse('\n' in output_fp.getvalue())
+        self.assertFalse(', ' in output_fp.getvalue())
+        output_fp.seek(0)
+        self.assertEqual(
+            TABLE.MAPPINGDICTS,
+            tuple(json.load(output_fp)),
+        )
+
+        output_fp = ioclass()
+        self.assertEqual(0, dump_mappings_as_json_table((), output_fp))
+        self.assertEqual('[]', output_fp.getvalue())
+
+    def test_dump_and_load_columns(self):
+        from ktug_hanyang_pua.fileformats.table_json import dump_mappings_as_json_table  # noqa
+        from ktug_hanyang_pua.fileformats.table_json import load_mappings_as_json_table  # noqa
+        from ktug_hanyang_pua.models import Comment
+
+        if PY3:
+            ioclass = StringIO
+        else:
+            ioclass = BytesIO
+        mappinglist = TABLE.MAPPINGLIST[:-1] + (
+            TABLE.MAPPINGLIST[-1]._replace(comment=Comment(' empty')),
+        )
+        output_fp = ioclass()
+        n = dump_mappings_as_json_table(
+            iter(mappinglist), output_fp, columnar=True,
+        )
+        self.assertEqual(len(mappinglist), n)
+        output_fp.seek(0)
+        columns = json.load(output_fp)
+        self.assertEqual('columns', columns['layout'])
+        self.assertEqual(
+            [mapping.source[0] for mapping in mappinglist],
+            columns['sources'],
+        )
+
+        output_fp.seek(0)
+        self.assertEqual(
+            mappinglist,
+            tuple(load_mappings_as_json_table(output_fp)),
+        )
+
+        for text in ('{}', '{"layout": "columns"}'):
+            self.assertRaises(
+                ValueError, list, load_mappings_as_json_table(ioclass(text)),
+            )
+
 
 class BinaryTableFileFormatTest(TestCase):
 
@@ -134,6 +289,178 @@ class BinaryTableFileFormatTest(TestCase):
             tuple(mappings),
         )
 
+    def test_binary_table(self):
+        from ktug_hanyang_pua.fileformats.table_binary import BinaryTable
+        from ktug_hanyang_pua.fileformats.table_binary import dump_mappings_as_binary_table  # noqa
+
+        output_fp = BytesIO()
+        dump_mappings_as_binary_table(TABLE.MAPPINGLIST, output_fp)
+        data = output_fp.getvalue()
+
+        for input in (BytesIO(data), data):
+            table = BinaryTable(input)
+            self.assertEqual(len(TABLE.MAPPINGLIST), len(table))
+            for mapping in TABLE.MAPPINGLIST:
+                self.assertTrue(mapping.source[0] in table)
+                self.assertEqual(mapping.target, table[mapping.source[0]])
+            self.assertEqual(
+                [mapping.source[0] for mapping in TABLE.MAPPINGLIST],
+                list(table),
+            )
+            for codepoint in (0, 0xE0BB, 0xE0BE, 0xE0C5, 0xE0C9, 0xF86B):
+                self.assertFalse(codepoint in table)
+                self.assertRaises(KeyError, lambda: table[codepoint])
+                self.assertEqual(None, table.get(codepoint))
+
+        self.assertRaises(ValueError, BinaryTable, data[:5])
+
+    def test_binary_table_mmap(self):
+        from ktug_hanyang_pua.fileformats.table_binary import BinaryTable
+        from ktug_hanyang_pua.fileformats.table_binary import dump_mappings_as_binary_table  # noqa
+
+        for version in (1, 2):
+            output_fp = BytesIO()
+            dump_mappings_as_binary_table(
+                TABLE.MAPPINGLIST, output_fp, version=version,
+            )
+            mapped = map_bytes(output_fp.getvalue())
+            try:
+                # 위치와 상관없이 처음부터 읽는다.
+                mapped.seek(5)
+                table = BinaryTable(mapped)
+                self.assertEqual(len(TABLE.MAPPINGLIST), len(table))
+                for mapping in TABLE.MAPPINGLIST:
+                    self.assertEqual(
+                        mapping.target, table[mapping.source[0]],
+                    )
+                self.assertEqual(None, table.get(0xE0BE))
+                if LITTLE_ENDIAN:
+                    self.assertTrue(table.lengths.obj is mapped)
+                    self.assertTrue(table.targets.obj is mapped)
+                del table
+            finally:
+                mapped.close()
+
+    def test_stream(self):
+        from ktug_hanyang_pua.fileformats.table_binary import dump_mappings_as_binary_table  # noqa
+        from ktug_hanyang_pua.fileformats.table_binary import stream_mappings_as_binary_table  # noqa
+
+        mappings = list(reversed(TABLE.MAPPINGLIST))
+        for version in (1, 2):
+            expected_fp = BytesIO()
+            expected = dump_mappings_as_binary_table(
+                mappings, expected_fp, version=version,
+            )
+            # 예산이 작으면 매핑마다 임시 파일로 내보내고 병합한다. 예산의
+            # 4 분의 1 이 0 이 되어도 그렇다.
+            for memory_budget in (1, 3, 1024 * 1024):
+                output_fp = BytesIO()
+                self.assertEqual(
+                    expected,
+                    stream_mappings_as_binary_table(
+                        iter(mappings), output_fp, version=version,
+                        memory_budget=memory_budget,
+                    ),
+                )
+                self.assertEqual(
+                    expected_fp.getvalue(),
+                    output_fp.getvalue(),
+                )
+
+    def test_max_gap(self):
+        from ktug_hanyang_pua.fileformats.table_binary import BinaryTable
+        from ktug_hanyang_pua.fileformats.table_binary import HOLE
+        from ktug_hanyang_pua.fileformats.table_binary import dump_mappings_as_binary_table  # noqa
+        from ktug_hanyang_pua.fileformats.table_binary import load_mappings_as_binary_table  # noqa
+
+        sources = [mapping.source[0] for mapping in TABLE.MAPPINGLIST]
+        # U+E0BE..U+E0C5 를 빈 자리로 두고 앞의 두 그룹을 합친다.
+        for memory_budget in (None, 1):
+            output_fp = BytesIO()
+            self.assertEqual(
+                (2, len(TABLE.MAPPINGLIST)),
+                dump_mappings_as_binary_table(
+                    TABLE.MAPPINGLIST, output_fp, version=2,
+                    memory_budget=memory_budget, max_gap=8,
+                ),
+            )
+            data = output_fp.getvalue()
+            if memory_budget is None:
+                expected = data
+            else:
+                self.assertEqual(expected, data)
+
+        output_fp.seek(0)
+        self.assertEqual(
+            TABLE.MAPPINGLIST,
+            tuple(load_mappings_as_binary_table(output_fp)),
+        )
+        table = BinaryTable(data)
+        self.assertEqual(len(TABLE.MAPPINGLIST), len(table))
+        self.assertEqual(sources, list(table))
+        self.assertEqual(
+            list(range(0xE0BC, 0xE0C9)) + [0xF86A],
+            list(table.iter_entries()),
+        )
+        for mapping in TABLE.MAPPINGLIST:
+            self.assertEqual(mapping.target, table[mapping.source[0]])
+        for codepoint in (0xE0BE, 0xE0C5, 0xE0C9):
+            self.assertFalse(codepoint in table)
+            self.assertEqual(None, table.get(codepoint))
+        # 빈 target 은 빈 자리가 아니다.
+        self.assertEqual((), table[0xF86A])
+        self.assertEqual([HOLE] * 8, list(table.lengths[2:10]))
+
+        output_fp = BytesIO()
+        self.assertEqual(
+            (3, len(TABLE.MAPPINGLIST)),
+            dump_mappings_as_binary_table(
+                TABLE.MAPPINGLIST, output_fp, version=2, max_gap=7,
+            ),
+        )
+
+        # 버전 1 의 옛 판독기는 빈 자리의 길이를 target 길이로 읽는다.
+        for memory_budget in (None, 1):
+            self.assertRaises(
+                ValueError,
+                dump_mappings_as_binary_table,
+                TABLE.MAPPINGLIST, BytesIO(), version=1,
+                memory_budget=memory_budget, max_gap=8,
+            )
+
+    def test_dump_and_load_v2(self):
+        from ktug_hanyang_pua.fileformats.table_binary import BinaryTable
+        from ktug_hanyang_pua.fileformats.table_binary import dump_mappings_as_binary_table  # noqa
+        from ktug_hanyang_pua.fileformats.table_binary import load_mappings_as_binary_table  # noqa
+
+        output_fp = BytesIO()
+        n_groups, n_mappings = dump_mappings_as_binary_table(
+            TABLE.MAPPINGLIST, output_fp, version=2,
+        )
+        self.assertEqual((3, len(TABLE.MAPPINGLIST)), (n_groups, n_mappings))
+        data = output_fp.getvalue()
+        self.assertEqual(b'KHTB\x02\x00', data[:6])
+
+        output_fp.seek(0)
+        mappings = load_mappings_as_binary_table(output_fp)
+        self.assertEqual(
+            TABLE.MAPPINGLIST,
+            tuple(mappings),
+        )
+
+        table = BinaryTable(data)
+        self.assertEqual(len(TABLE.MAPPINGLIST), len(table))
+        for mapping in TABLE.MAPPINGLIST:
+            self.assertEqual(mapping.target, table[mapping.source[0]])
+        self.assertEqual(None, table.get(0xE0BE))
+
+        self.assertRaises(ValueError, BinaryTable, data[:-1])
+        self.assertRaises(
+            ValueError,
+            dump_mappings_as_binary_table,
+            TABLE.MAPPINGLIST, BytesIO(), version=3,
+        )
+
 
 class BinaryTreeFileFormatTest(TestCase):
 
@@ -150,6 +477,91 @@ class BinaryTreeFileFormatTest(TestCase):
             output_fp.getvalue(),
         )
 
+    def test_load(self):
+        from ktug_hanyang_pua.fileformats.tree_binary import load_tree_as_binary  # noqa
+
+        data = b''.join(TREE.NODEPACKS)
+        for input in (BytesIO(data), data):
+            tree = load_tree_as_binary(input)
+            self.assertEqual(TREE.NODELIST, tuple(tree))
+            self.assertEqual(TREE.NODE_CHILDRENS, tree.node_childrens)
+
+    def test_load_truncated(self):
+        from ktug_hanyang_pua.fileformats.tree_binary import load_tree_as_binary  # noqa
+
+        self.assertRaises(
+            ValueError,
+            load_tree_as_binary,
+            b''.join(TREE.NODEPACKS)[:-1],
+        )
+
+    def test_dump_and_load_v2(self):
+        from ktug_hanyang_pua.fileformats.tree_binary import dump_tree_as_binary  # noqa
+        from ktug_hanyang_pua.fileformats.tree_binary import load_tree_as_binary  # noqa
+
+        output_fp = BytesIO()
+        n = dump_tree_as_binary(TREE.NODELIST, output_fp, version=2)
+        self.assertEqual(len(TREE.NODELIST), n)
+        data = output_fp.getvalue()
+        self.assertEqual(b'KHTR\x02\x00', data[:6])
+        # 3 columns, n + 1 offsets and n - 1 children
+        self.assertEqual(16 + 4 * 5 * n, len(data))
+
+        for input in (BytesIO(data), data):
+            tree = load_tree_as_binary(input)
+            self.assertEqual(TREE.NODELIST, tuple(tree))
+            self.assertEqual(TREE.NODE_CHILDRENS, tree.node_childrens)
+
+        self.assertRaises(ValueError, load_tree_as_binary, data[:-1])
+        self.assertRaises(
+            ValueError,
+            dump_tree_as_binary, TREE.NODELIST, BytesIO(), version=3,
+        )
+
+    def test_load_v2_mmap(self):
+        from ktug_hanyang_pua.fileformats.tree_binary import dump_tree_as_binary  # noqa
+        from ktug_hanyang_pua.fileformats.tree_binary import load_tree_as_binary  # noqa
+
+        output_fp = BytesIO()
+        dump_tree_as_binary(TREE.NODELIST, output_fp, version=2)
+        mapped = map_bytes(output_fp.getvalue())
+        try:
+            mapped.seek(5)
+            tree = load_tree_as_binary(mapped)
+            self.assertEqual(TREE.NODELIST, tuple(tree))
+            self.assertEqual(TREE.NODE_CHILDRENS, tree.node_childrens)
+            if LITTLE_ENDIAN:
+                self.assertTrue(tree.parents.obj is mapped)
+                self.assertTrue(tree.children.obj is mapped)
+            del tree
+        finally:
+            mapped.close()
+
+    def test_dump_and_load_v2_wide(self):
+        from ktug_hanyang_pua.fileformats.tree_binary import dump_tree_as_binary  # noqa
+        from ktug_hanyang_pua.fileformats.tree_binary import load_tree_as_binary  # noqa
+        from ktug_hanyang_pua.models import Mapping
+        from ktug_hanyang_pua.tree import build_tree
+
+        mappings = [
+            Mapping(source=(0x1100, 0x1161 + i % 20, 0x11A8 + i // 20),
+                    target=0xF0000 + i, comment=None)
+            for i in range(20 * 27)
+        ] + [
+            Mapping(source=(0x1100, 0x20000 + i), target=0x100000 + i,
+                    comment=None)
+            for i in range(40000)
+        ]
+        nodelist, node_childrens = build_tree(mappings)
+        self.assertTrue(len(nodelist) > 0x7FFF)
+
+        output_fp = BytesIO()
+        dump_tree_as_binary(nodelist, output_fp, version=2,
+                            node_childrens=node_childrens)
+        tree = load_tree_as_binary(output_fp.getvalue())
+        self.assertEqual(nodelist, tuple(tree))
+        self.assertEqual(node_childrens, tree.node_childrens)
+
 
 class JsonTreeFileFormatTest(TestCase):
 
@@ -171,3 +583,106 @@ class JsonTreeFileFormatTest(TestCase):
             TREE.NODEDICTS,
             tuple(nodes),
         )
+
+        output_fp = ioclass()
+        n = dump_tree_as_json(iter(TREE.NODELIST), output_fp, compact=True)
+        self.assertEqual(len(TREE.NODELIST), n)
+        self.assertFalse('\n' in output_fp.getvalue())
+        output_fp.seek(0)
+        self.assertEqual(
+            TREE.NODEDICTS,
+            tuple(json.load(output_fp)),
+        )
+
+    def test_load(self):
+        from ktug_hanyang_pua.fileformats.tree_json import dump_tree_as_json  # noqa
+        from ktug_hanyang_pua.fileformats.tree_json import load_tree_as_json  # noqa
+
+        if PY3:
+            ioclass = StringIO
+        else:
+            ioclass = BytesIO
+        output_fp = ioclass()
+        dump_tree_as_json(TREE.NODELIST, output_fp)
+
+        output_fp.seek(0)
+        tree = load_tree_as_json(output_fp)
+        self.assertEqual(TREE.NODELIST, tuple(tree))
+        self.assertEqual(TREE.NODE_CHILDRENS, tree.node_childrens)
+
+    def test_dump_and_load_columns(self):
+        from ktug_hanyang_pua.fileformats.tree_json import dump_tree_as_json  # noqa
+        from ktug_hanyang_pua.fileformats.tree_json import load_tree_as_json  # noqa
+
+        if PY3:
+            ioclass = StringIO
+        else:
+            ioclass = BytesIO
+        output_fp = ioclass()
+        n = dump_tree_as_json(iter(TREE.NODELIST), output_fp, columnar=True)
+        self.assertEqual(len(TREE.NODELIST), n)
+        output_fp.seek(0)
+        columns = json.load(output_fp)
+        self.assertEqual(
+            [node.parent for node in TREE.NODELIST],
+            columns['parents'],
+        )
+
+        output_fp.seek(0)
+        tree = load_tree_as_json(output_fp)
+        self.assertEqual(TREE.NODELIST, tuple(tree))
+        self.assertEqual(TREE.NODE_CHILDRENS, tree.node_childrens)
+
+
+class DoubleArrayTreeFileFormatTest(TestCase):
+
+    maxDiff = None
+
+    def test_dump_and_load(self):
+        from ktug_hanyang_pua.doublearray import build_double_array
+        from ktug_hanyang_pua.fileformats.tree_doublearray import dump_tree_as_double_array  # noqa
+        from ktug_hanyang_pua.fileformats.tree_doublearray import load_tree_as_double_array  # noqa
+
+        trie = build_double_array(TREE.NODELIST, TREE.NODE_CHILDRENS)
+        output_fp = BytesIO()
+        n = dump_tree_as_double_array(trie, output_fp)
+        self.assertEqual(len(trie.base), n)
+        self.assertEqual(16 + 4 * (len(trie.alphabet) + 3 * n),
+                         len(output_fp.getvalue()))
+
+        for input in (BytesIO(output_fp.getvalue()), output_fp.getvalue()):
+            loaded = load_tree_as_double_array(input)
+            self.assertEqual(list(trie.alphabet), list(loaded.alphabet))
+            self.assertEqual(list(trie.base), list(loaded.base))
+            self.assertEqual(list(trie.check), list(loaded.check))
+            self.assertEqual(list(trie.targets), list(loaded.targets))
+            self.assertEqual(0xE0C7, loaded.lookup((0x115F, 0x11A3, 0x11AE)))
+
+    def test_load_mmap(self):
+        from ktug_hanyang_pua.doublearray import build_double_array
+        from ktug_hanyang_pua.fileformats.tree_doublearray import dump_tree_as_double_array  # noqa
+        from ktug_hanyang_pua.fileformats.tree_doublearray import load_tree_as_double_array  # noqa
+
+        trie = build_double_array(TREE.NODELIST, TREE.NODE_CHILDRENS)
+        output_fp = BytesIO()
+        dump_tree_as_double_array(trie, output_fp)
+        mapped = map_bytes(output_fp.getvalue())
+        try:
+            mapped.seek(5)
+            loaded = load_tree_as_double_array(mapped)
+            self.assertEqual(list(trie.base), list(loaded.base))
+            self.assertEqual(0xE0C7, loaded.lookup((0x115F, 0x11A3, 0x11AE)))
+            if LITTLE_ENDIAN:
+                self.assertTrue(loaded.base.obj is mapped)
+            del loaded
+        finally:
+            mapped.close()
+
+    def test_load_invalid(self):
+        from ktug_hanyang_pua.fileformats.tree_doublearray import load_tree_as_double_array  # noqa
+
+        self.assertRaises(
+            ValueError,
+            load_tree_as_double_array,
+            b''.join(TREE.NODEPACKS),
+        )
@@ -149,6 +149,29 @@ class LineFormatTest(TestCase):
             formatted,
         )
 
+    def test_parse_fast_and_fallback(self):
+        from ktug_hanyang_pua.models import Comment
+        from ktug_hanyang_pua.models import EMPTY
+        from ktug_hanyang_pua.models import Mapping
+
+        lineFormat = self.make_one()
+        for line, expected in (
+            # 정규식으로 읽는 줄
+            ('U+1100 => U+1161 %%% x\n',
+             Mapping((0x1100,), (0x1161,), Comment(' x'))),
+            ('U+F86A =>\n', Mapping((0xF86A,), (), None)),
+            ('U+F86A => %%%c', Mapping((0xF86A,), (), Comment('c'))),
+            ('%%% comment\n', Comment(' comment')),
+            ('\n', EMPTY),
+            # parsec 문법으로 읽는 줄
+            ('U+1100  U+1101=>U+1161\t%%%x\n',
+             Mapping((0x1100, 0x1101), (0x1161,), Comment('x'))),
+            ('U+1100 => U+1161 \n', Mapping((0x1100,), (0x1161,), None)),
+            ('unknown', EMPTY),
+        ):
+            self.assertEqual(expected, lineFormat.parse(line))
+            self.assertEqual(expected, lineFormat.parse_fallback(line))
+
     def test_format_typeerror(self):
         lineFormat = self.make_one()
         try:
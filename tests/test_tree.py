@@ -64,3 +64,151 @@ class TreeTest(TestCase):
             TREE.NODE_CHILDRENS,
             node_childrens,
         )
+
+    def test_tree_columns(self):
+        from ktug_hanyang_pua.encoder import Encoder
+        from ktug_hanyang_pua.tree import TreeColumns
+
+        tree = TreeColumns(
+            [node.parent for node in TREE.NODELIST],
+            [node.source or 0 for node in TREE.NODELIST],
+            [node.target or 0 for node in TREE.NODELIST],
+        )
+        self.assertEqual(len(TREE.NODELIST), len(tree))
+        self.assertEqual(TREE.NODELIST[3], tree[3])
+        self.assertEqual(TREE.NODELIST[-1], tree[-1])
+        self.assertEqual(TREE.NODELIST, tuple(tree))
+        self.assertEqual(TREE.NODE_CHILDRENS, tree.node_childrens)
+
+        encoder = Encoder.from_tree(tree, tree.node_childrens)
+        self.assertEqual(
+            u'\ue0c7',
+            encoder.encode(u'\u115f\u11a3\u11ae'),
+        )
+
+        self.assertRaises(ValueError, TreeColumns, [-1], [], [])
+
+    def test_build_compact_tree(self):
+        from ktug_hanyang_pua.models import Mapping
+        from ktug_hanyang_pua.models import Node
+        from ktug_hanyang_pua.formats import IterableFormat
+        from ktug_hanyang_pua.formats import LineFormat
+        from ktug_hanyang_pua.tree import build_compact_tree
+
+        mappingsFormat = IterableFormat(LineFormat())
+        mappings = mappingsFormat.parse(TREE.MAPPINGS)
+        mappings = (
+            Mapping(
+                source=m.target,
+                target=m.source[0],
+                comment=None,
+            )
+            for m in mappings
+        )
+
+        tree = build_compact_tree(mappings)
+
+        # 너비 우선으로, 형제는 source 순서로 번호가 매겨진다.
+        self.assertEqual((
+            Node(parent=-1, source=None, target=0xF86A),
+            Node(parent=0, source=0x115F, target=None),
+            Node(parent=1, source=0x1161, target=None),
+            Node(parent=1, source=0x1163, target=None),
+            Node(parent=1, source=0x11A3, target=0xE0C6),
+            Node(parent=2, source=0x11AE, target=0xE0BC),
+            Node(parent=2, source=0xD7CD, target=0xE0BD),
+            Node(parent=3, source=0x11AB, target=0xE0C8),
+            Node(parent=4, source=0x11AE, target=0xE0C7),
+        ), tuple(tree))
+        self.assertEqual((
+            ((0x115F, 1),),
+            ((0x1161, 2), (0x1163, 3), (0x11A3, 4)),
+            ((0x11AE, 5), (0xD7CD, 6)),
+            ((0x11AB, 7),),
+            ((0x11AE, 8),),
+            (), (), (), (),
+        ), tree.node_childrens)
+        self.assertEqual(list(range(1, len(tree))), list(tree.children))
+
+    def test_build_children_index(self):
+        from ktug_hanyang_pua.encoder import Encoder
+        from ktug_hanyang_pua.tree import TreeColumns
+        from ktug_hanyang_pua.tree import build_children_index
+
+        index = build_children_index(TREE.NODELIST)
+        self.assertEqual(len(TREE.NODELIST), len(index))
+        self.assertEqual(TREE.NODE_CHILDRENS, tuple(index))
+        self.assertEqual(TREE.NODE_CHILDRENS[-1], index[-1])
+        for node_index, children in enumerate(TREE.NODE_CHILDRENS):
+            for codepoint, child in children:
+                self.assertEqual(child, index.child(node_index, codepoint))
+            self.assertEqual(-1, index.child(node_index, 0x1100))
+            self.assertEqual(-1, index.child(node_index, 0xFFFF))
+
+        encoder = Encoder.from_tree(TREE.NODELIST, index)
+        self.assertEqual(
+            u'\ue0c7',
+            encoder.encode(u'\u115f\u11a3\u11ae'),
+        )
+
+        # CSR 자식이 있으면 그대로 쓴다.
+        columns = TreeColumns(
+            [-1, 0, 0],
+            [0, 0x1161, 0x1100],
+            [0, 0xE0BC, 0xE0BD],
+            [0, 2, 2, 2],
+            [2, 1],
+        )
+        index = build_children_index(columns)
+        self.assertEqual(((0x1100, 2), (0x1161, 1)), index[0])
+        self.assertEqual(tuple(index), tuple(columns.children_index))
+        self.assertEqual(-1, index.child(1, 0x1100))
+
+        # 루트의 자식은 범위마다의 표에서, 빈 자리는 -1
+        self.assertEqual(
+            (0x1100, 0xA960),
+            tuple(start for start, table in index.root_tables),
+        )
+        self.assertEqual(2, index.child(0, 0x1100))
+        self.assertEqual(1, index.child(0, 0x1161))
+        self.assertEqual(-1, index.child(0, 0x1101))
+        self.assertEqual(-1, index.child(0, 0x10FF))
+
+    def test_build_root_tables(self):
+        from ktug_hanyang_pua.tree import ChildrenIndex
+        from ktug_hanyang_pua.tree import build_root_tables
+
+        root_children = ((0x41, 3), (0x1100, 1), (0x1102, 4), (0xA960, 2))
+        (low, low_table), (high, high_table) = build_root_tables(
+            root_children
+        )
+        self.assertEqual(0x1100, low)
+        self.assertEqual(0x61, len(low_table))
+        self.assertEqual([1, -1, 4], list(low_table[:3]))
+        self.assertEqual(0xA960, high)
+        self.assertEqual(0x1D, len(high_table))
+        self.assertEqual([2, -1], list(high_table[:2]))
+
+        ((base, table), ) = build_root_tables(
+            root_children, ((0x1100, 0x1103), ),
+        )
+        self.assertEqual([1, -1, 4], list(table))
+        self.assertEqual((), build_root_tables(root_children, ()))
+
+        # 표 밖의 자식은 찾아서
+        index = ChildrenIndex(
+            [0, 4, 4, 4, 4, 4],
+            [0x41, 0x1100, 0x1102, 0xA960],
+            [3, 1, 4, 2],
+            root_ranges=((0x1100, 0x1160), ),
+        )
+        self.assertEqual(3, index.child(0, 0x41))
+        self.assertEqual(1, index.child(0, 0x1100))
+        self.assertEqual(2, index.child(0, 0xA960))
+        self.assertEqual(-1, index.child(0, 0xA961))
+
+        index = ChildrenIndex(
+            index.offsets, index.codepoints, index.nodes, root_ranges=(),
+        )
+        self.assertEqual((), index.root_tables)
+        self.assertEqual(4, index.child(0, 0x1102))